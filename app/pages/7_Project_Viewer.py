@@ -32,6 +32,31 @@ ARTIFACT_LABELS = {
     "labeled_data": "Labeled Dataset",
 }
 
+ARTIFACT_TYPE_BADGE = {k: badge(v, COLORS["primary"]) for k, v in ARTIFACT_LABELS.items()}
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_load_artifact_data(project_id: str, artifact_id: str, artifact_type: str, _artifact):
+    """Load an artifact's data file once per artifact; files are never rewritten after save."""
+    data = load_artifact_data(project_id, _artifact)
+    if data is None:
+        # Raising keeps the miss out of the cache, so the file is looked for again next time
+        raise FileNotFoundError(_artifact.filename)
+    # Roadmap steps are rendered in order — sort once here instead of on every rerun
+    if artifact_type == "roadmap" and isinstance(data, dict) and isinstance(data.get("result"), dict):
+        steps = data["result"].get("methodology_steps")
+        if steps:
+            data["result"]["methodology_steps"] = sorted(steps, key=lambda x: x.get("step", 0))
+    return data
+
+
+def _load_artifact_data(project_id: str, artifact):
+    try:
+        return _cached_load_artifact_data(project_id, artifact.id, artifact.artifact_type, artifact)
+    except FileNotFoundError:
+        return None
+
+
 if not active_project:
     st.info("Select or create a project using the sidebar to view its contents.")
     st.stop()
@@ -77,13 +102,13 @@ st.subheader(f"Project Timeline ({len(artifacts)} artifacts)")
 for idx, artifact in enumerate(reversed(artifacts)):
     icon = ARTIFACT_ICONS.get(artifact.artifact_type, "📄")
     label = ARTIFACT_LABELS.get(artifact.artifact_type, artifact.artifact_type)
-    type_badge = badge(label, COLORS["primary"])
+    type_badge = ARTIFACT_TYPE_BADGE.get(artifact.artifact_type) or badge(label, COLORS["primary"])
     ts = artifact.created_at[:16].replace("T", " ")
 
     with st.expander(f"{icon} {artifact.name} — {ts}", expanded=(idx == 0)):
         st.markdown(f"{type_badge}", unsafe_allow_html=True)
 
-        data = load_artifact_data(active_project, artifact)
+        data = _load_artifact_data(active_project, artifact)
         if data is None:
             st.warning("Artifact data file not found.")
             continue
@@ -176,7 +201,7 @@ def _render_roadmap(data):
     steps = result.get("methodology_steps", [])
     if steps:
         st.markdown(f"**Methodology ({len(steps)} steps):**")
-        for s in sorted(steps, key=lambda x: x.get("step", 0)):
+        for s in steps:
             st.markdown(f"{s.get('step', '?')}. **{s.get('title', '')}** ({s.get('estimated_time', '')}) — {s.get('description', '')}")
 
     datasets = result.get("suggested_datasets", [])
@@ -1,4 +1,5 @@
 """Design system + reusable UI helpers."""
+import functools
 import streamlit as st
 
 # Color palette
@@ -118,8 +119,11 @@ def card(content_html: str):
 
 
 def badge(text: str, color: str = None):
-    color = color or COLORS["primary"]
-    text_color = "#FFFFFF"
+    return _badge_cached(text, color or COLORS["primary"])
+
+
+@functools.lru_cache(maxsize=1024)
+def _badge_cached(text: str, color: str) -> str:
     return f'<span class="badge" style="background:{color}20; color:{color}; border:1px solid {color}40;">{text}</span>'
 
 
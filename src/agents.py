@@ -1,76 +1,60 @@
 """LangGraph agent node implementations."""
 import json
 import os
+from functools import lru_cache
 from typing import Optional
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.types import Command
 
 from src.config import get_config, get_llm
 from src.models import LabelPrediction, CriticReview, FallbackReason
-from src.prompts import get_labeling_prompt, get_critic_prompt
+from src.prompts import get_labeling_prompt, get_labeling_prompt_batch, get_critic_prompt
+from src.llm_utils import (
+    parse_llm_json, call_and_parse, acall_and_parse, invoke_with_retry, ainvoke_with_retry,
+)
 
 
-def _safe_parse_json(text: str) -> Optional[dict]:
-    """Extract JSON from LLM response text."""
-    text = text.strip()
-    # Try direct parse
+def _load_rubric(task_type: str) -> dict:
+    rubric_path = os.path.join("config", "rubrics", f"{task_type.lower()}.json")
     try:
-        return json.loads(text)
-    except Exception:
-        pass
-    # Try markdown code block
-    import re
-    match = re.search(r"```(?:json)?\s*([\s\S]+?)```", text)
-    if match:
-        try:
-            return json.loads(match.group(1).strip())
-        except Exception:
-            pass
-    # Try finding first {...}
-    match = re.search(r"\{[\s\S]+\}", text)
-    if match:
-        try:
-            return json.loads(match.group(0))
-        except Exception:
-            pass
-    return None
+        mtime = os.stat(rubric_path).st_mtime_ns
+    except OSError:
+        return {}
+    return _load_rubric_cached(rubric_path, mtime)
 
 
-def _load_rubric(task_type: str) -> dict:
-    rubric_path = os.path.join("config", "rubrics", f"{task_type.lower()}.json")
-    if os.path.exists(rubric_path):
-        with open(rubric_path) as f:
-            return json.load(f)
-    return {}
+@lru_cache(maxsize=32)
+def _load_rubric_cached(rubric_path: str, mtime: int) -> dict:
+    # mtime is part of the key so an edited rubric is re-read
+    with open(rubric_path) as f:
+        return json.load(f)
 
 
-def labeler_node(state: dict) -> Command:
-    """Labels the input data, incorporating critic feedback on retry."""
-    config = get_config()
-    llm = get_llm(config.labeler_model)
+def _messages(prompt: tuple[str, str]) -> list:
+    system, user = prompt
+    return [SystemMessage(content=system), HumanMessage(content=user)]
+
 
+def _labeling_prompt(state: dict) -> list:
     critic_feedback = ""
     if state.get("critic_review") and not state["critic_review"].get("is_correct", True):
         critic_feedback = state["critic_review"].get("critique", "")
 
     text_content = state["input_data"].get("text_content", str(state["input_data"]))
-    prompt = get_labeling_prompt(state["task_type"], text_content, critic_feedback)
+    return _messages(get_labeling_prompt(state["task_type"], text_content, critic_feedback))
 
-    error_log = list(state.get("error_log", []))
-    labeler_output = None
 
-    for attempt in range(2):
-        try:
-            response = llm.invoke([HumanMessage(content=prompt)])
-            parsed = _safe_parse_json(response.content)
-            if parsed:
-                # Validate with Pydantic
-                pred = LabelPrediction(**parsed)
-                labeler_output = pred.model_dump()
-                break
-        except Exception as e:
-            error_log.append(f"Labeler attempt {attempt + 1} failed: {str(e)}")
+def _skipped_review(state: dict, labeler_output: dict) -> Optional[dict]:
+    """Synthesized critic review for a confident first-pass label, or None if the critic should run."""
+    if state.get("critic_review"):
+        return None
+    confidence = labeler_output.get("confidence", 0)
+    if confidence < get_config().critic_skip_threshold:
+        return None
+    return {"is_correct": True, "confidence_score": confidence, "critique": "skipped"}
+
 
+def _route_labeler(state: dict, labeler_output: Optional[dict], error_log: list) -> Command:
     if labeler_output is None:
         error_log.append("Labeler: all attempts failed, sending to fallback")
         return Command(
@@ -82,53 +66,141 @@ def labeler_node(state: dict) -> Command:
             }
         )
 
-    attempts = list(state.get("labeler_attempts", []))
-    attempts.append(labeler_output)
+    skipped = _skipped_review(state, labeler_output)
+    if skipped is not None:
+        return Command(
+            goto="validator_node",
+            update={
+                "labeler_output": labeler_output,
+                "labeler_attempts": [labeler_output],
+                "critic_review": skipped,
+                "critic_reviews": [skipped],
+                "error_log": error_log,
+            }
+        )
 
     return Command(
         goto="critic_node",
         update={
             "labeler_output": labeler_output,
-            "labeler_attempts": attempts,
+            "labeler_attempts": [labeler_output],
             "error_log": error_log,
         }
     )
 
 
-def critic_node(state: dict) -> Command:
-    """Evaluates the labeler's output and routes accordingly."""
+def labeler_node(state: dict) -> Command:
+    """Labels the input data, incorporating critic feedback on retry."""
     config = get_config()
-    llm = get_llm(config.critic_model)
+    llm = get_llm(config.labeler_model)
+    messages = _labeling_prompt(state)
+
+    error_log = []
+    labeler_output = None
+
+    try:
+        parsed = call_and_parse(llm, messages, LabelPrediction)
+        if parsed is not None:
+            labeler_output = parsed.model_dump()
+    except Exception as e:
+        error_log.append(f"Labeler call failed: {str(e)}")
+
+    return _route_labeler(state, labeler_output, error_log)
+
+
+async def alabeler_node(state: dict) -> Command:
+    """Async variant of labeler_node, used by the batch runner."""
+    config = get_config()
+    llm = get_llm(config.labeler_model)
+    messages = _labeling_prompt(state)
+
+    error_log = []
+    labeler_output = None
+
+    try:
+        parsed = await acall_and_parse(llm, messages, LabelPrediction)
+        if parsed is not None:
+            labeler_output = parsed.model_dump()
+    except Exception as e:
+        error_log.append(f"Labeler call failed: {str(e)}")
 
+    return _route_labeler(state, labeler_output, error_log)
+
+
+def _batch_prompt(states: list[dict]) -> list:
+    items = [(s["data_id"], s["input_data"].get("text_content", "")) for s in states]
+    return _messages(get_labeling_prompt_batch(states[0]["task_type"], items))
+
+
+def _split_batch(states: list[dict], content: str) -> list[dict]:
+    parsed = parse_llm_json(content)
+    if not isinstance(parsed, list) or len(parsed) != len(states):
+        return states
+    labeled = []
+    for state, item in zip(states, parsed):
+        try:
+            labeler_output = LabelPrediction(**item).model_dump()
+        except Exception:
+            labeled.append(state)
+            continue
+        labeled_state = {
+            **state,
+            "labeler_output": labeler_output,
+            "labeler_attempts": list(state.get("labeler_attempts", [])) + [labeler_output],
+        }
+        skipped = _skipped_review(state, labeler_output)
+        if skipped is not None:
+            labeled_state["critic_review"] = skipped
+            labeled_state["critic_reviews"] = list(state.get("critic_reviews", [])) + [skipped]
+        labeled.append(labeled_state)
+    return labeled
+
+
+def labeler_batch_node(states: list[dict]) -> list[dict]:
+    """
+    First-pass labels for several same-task states in one LLM call.
+
+    Returns the states with labeler output filled in for every item the
+    response could be split into; the rest are returned unchanged and go
+    through labeler_node as usual.
+    """
+    config = get_config()
+    llm = get_llm(config.labeler_model)
+    try:
+        response = invoke_with_retry(llm, _batch_prompt(states))
+    except Exception:
+        return states
+    return _split_batch(states, response.content)
+
+
+async def alabeler_batch_node(states: list[dict]) -> list[dict]:
+    """Async variant of labeler_batch_node, used by the batch runner."""
+    config = get_config()
+    llm = get_llm(config.labeler_model)
+    try:
+        response = await ainvoke_with_retry(llm, _batch_prompt(states))
+    except Exception:
+        return states
+    return _split_batch(states, response.content)
+
+
+def _critic_prompt(state: dict) -> list:
     rubric = _load_rubric(state["task_type"])
     text_content = state["input_data"].get("text_content", str(state["input_data"]))
-    prompt = get_critic_prompt(
+    return _messages(get_critic_prompt(
         state["task_type"],
         text_content,
         state["labeler_output"],
         rubric,
-    )
-
-    error_log = list(state.get("error_log", []))
-    critic_review = None
+    ))
 
-    for attempt in range(2):
-        try:
-            response = llm.invoke([HumanMessage(content=prompt)])
-            parsed = _safe_parse_json(response.content)
-            if parsed:
-                review = CriticReview(**parsed)
-                critic_review = review.model_dump()
-                break
-        except Exception as e:
-            error_log.append(f"Critic attempt {attempt + 1} failed: {str(e)}")
 
+def _route_critic(state: dict, critic_review: Optional[dict], error_log: list) -> Command:
     if critic_review is None:
         # Default: accept the label
         critic_review = {"is_correct": True, "confidence_score": 70, "critique": "Critic parse error - accepting label"}
 
-    reviews = list(state.get("critic_reviews", []))
-    reviews.append(critic_review)
+    reviews = [critic_review]
     retry_count = state.get("retry_count", 0)
 
     if critic_review["is_correct"]:
@@ -159,6 +231,44 @@ def critic_node(state: dict) -> Command:
         )
 
 
+def critic_node(state: dict) -> Command:
+    """Evaluates the labeler's output and routes accordingly."""
+    config = get_config()
+    llm = get_llm(config.critic_model)
+    messages = _critic_prompt(state)
+
+    error_log = []
+    critic_review = None
+
+    try:
+        parsed = call_and_parse(llm, messages, CriticReview)
+        if parsed is not None:
+            critic_review = parsed.model_dump()
+    except Exception as e:
+        error_log.append(f"Critic call failed: {str(e)}")
+
+    return _route_critic(state, critic_review, error_log)
+
+
+async def acritic_node(state: dict) -> Command:
+    """Async variant of critic_node, used by the batch runner."""
+    config = get_config()
+    llm = get_llm(config.critic_model)
+    messages = _critic_prompt(state)
+
+    error_log = []
+    critic_review = None
+
+    try:
+        parsed = await acall_and_parse(llm, messages, CriticReview)
+        if parsed is not None:
+            critic_review = parsed.model_dump()
+    except Exception as e:
+        error_log.append(f"Critic call failed: {str(e)}")
+
+    return _route_critic(state, critic_review, error_log)
+
+
 def validator_node(state: dict) -> Command:
     """Validates confidence threshold and constructs final output."""
     config = get_config()
@@ -174,7 +284,7 @@ def validator_node(state: dict) -> Command:
             goto="fallback_node",
             update={
                 "fallback_to_human": True,
-                "error_log": list(state.get("error_log", [])) + [
+                "error_log": [
                     f"Validator: confidence {final_conf} below threshold {config.min_confidence_threshold}"
                 ],
             }
@@ -199,9 +309,9 @@ def validator_node(state: dict) -> Command:
 def fallback_node(state: dict) -> Command:
     """Writes item to human review queue."""
     try:
-        from src.fallback import write_to_review_queue
+        from src.fallback import write_to_review_queue, write_to_review_queue_jsonl
     except ImportError:
-        write_to_review_queue = None
+        write_to_review_queue = write_to_review_queue_jsonl = None
     from src.models import HumanReviewItem
     import datetime
 
@@ -213,9 +323,9 @@ def fallback_node(state: dict) -> Command:
     error_log = state.get("error_log", [])
     if retry_count >= state.get("max_retries", 3):
         reason = FallbackReason.RETRY_LIMIT
-    elif "confidence" in str(error_log):
+    elif any("confidence" in e for e in error_log):
         reason = FallbackReason.LOW_CONFIDENCE
-    elif "Parse error" in str(error_log):
+    elif any("Parse error" in e for e in error_log):
         reason = FallbackReason.PARSING_ERROR
     else:
         reason = FallbackReason.VALIDATION_ERROR
@@ -227,13 +337,16 @@ def fallback_node(state: dict) -> Command:
         critic_reviews=state.get("critic_reviews", []),
         error_log=error_log,
         fallback_reason=reason.value,
-        timestamp=datetime.datetime.utcnow().isoformat(),
+        timestamp=datetime.datetime.now(datetime.timezone.utc).isoformat(),
     )
 
     if write_to_review_queue is not None:
         try:
             config = get_config()
-            write_to_review_queue(item, config)
+            if config.review_queue_backend == "jsonl":
+                write_to_review_queue_jsonl(item, config)
+            else:
+                write_to_review_queue(item, config)
         except Exception:
             pass
 
@@ -1,6 +1,8 @@
 import os
 from dataclasses import dataclass, field
+from functools import lru_cache
 from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
 
 load_dotenv()
 
@@ -18,10 +20,17 @@ class SystemConfig:
     # Fallback
     max_retries: int = 3
     min_confidence_threshold: int = 85
+    # First-pass labels at or above this confidence skip the critic call
+    critic_skip_threshold: int = 95
+    # Batch labeling
+    labeling_parallelism: int = field(default_factory=lambda: int(os.getenv("LABELING_PARALLELISM", "4")))
+    labeler_marshal_k: int = field(default_factory=lambda: int(os.getenv("LABELER_MARSHAL_K", "8")))
     # Paths
     data_dir: str = "data"
     output_dir: str = "data/output"
     review_queue_dir: str = "data/review_queue"
+    # "json" writes one file per item; "jsonl" appends to review_queue_dir/queue.jsonl
+    review_queue_backend: str = field(default_factory=lambda: os.getenv("REVIEW_QUEUE_BACKEND", "json"))
 
 
 _config_instance = None
@@ -34,13 +43,17 @@ def get_config() -> SystemConfig:
     return _config_instance
 
 
-def get_llm(model_name: str = None):
-    from langchain_openai import ChatOpenAI
-    config = get_config()
-    model = model_name or config.labeler_model
+@lru_cache(maxsize=16)
+def _make_llm(model: str, temperature: float, max_tokens: int, api_key: str):
     return ChatOpenAI(
         model=model,
-        temperature=config.temperature,
-        max_tokens=config.max_tokens,
-        api_key=config.openai_api_key,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        api_key=api_key,
     )
+
+
+def get_llm(model_name: str = None):
+    config = get_config()
+    model = model_name or config.labeler_model
+    return _make_llm(model, config.temperature, config.max_tokens, config.openai_api_key)
@@ -0,0 +1,116 @@
+"""Bounded pool of pre-configured SQLite connections."""
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -20000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+)
+
+
+def apply_pragmas(conn: sqlite3.Connection):
+    """Configure a connection the way pooled connections are (WAL, NORMAL sync, mmap reads)."""
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+
+
+class ConnectionPool:
+    """
+    Hands out idle connections and takes them back on exit, so each
+    connection keeps its page cache across calls. Opens new connections
+    up to max_size, then blocks up to `timeout` seconds for one to free up.
+    """
+
+    def __init__(self, db_path: str, min_size: int = 2, max_size: int = 8, timeout: float = 10.0):
+        self.db_path = db_path
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=self.max_size)
+        self._lock = threading.Lock()
+        self._open = 0
+        for _ in range(min(min_size, self.max_size)):
+            self._idle.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections move between Streamlit's script threads; the pool
+        # guarantees only one thread holds a given connection at a time
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        apply_pragmas(conn)
+        with self._lock:
+            self._open += 1
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_open = self._open < self.max_size
+        if can_open:
+            return self._connect()
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No SQLite connection free after {self.timeout}s") from None
+
+    def _discard(self, conn: sqlite3.Connection):
+        try:
+            conn.close()
+        finally:
+            with self._lock:
+                self._open -= 1
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        except BaseException:
+            # State after a failure is unknown: roll back and replace the connection
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            self._discard(conn)
+            raise
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+
+_pool = None
+
+
+def init_pool(db_path: str, min_size: int = 2, max_size: int = 8) -> ConnectionPool:
+    """Create (or replace) the process-wide pool."""
+    global _pool
+    if _pool is not None:
+        _pool.close_all()
+    _pool = ConnectionPool(db_path, min_size=min_size, max_size=max_size)
+    return _pool
+
+
+@contextmanager
+def get_connection():
+    """Borrow a connection from the pool; commit inside the block to keep writes."""
+    if _pool is None:
+        raise RuntimeError("Connection pool not initialized; call init_pool() first")
+    with _pool.connection() as conn:
+        yield conn
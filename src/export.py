@@ -1,19 +1,70 @@
 """Data export utilities."""
+import datetime
 import io
 import json
 import pandas as pd
 
+try:
+    import orjson
+except ImportError:  # optional: falls back to pandas/stdlib serialization
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pcsv
+except ImportError:  # optional: falls back to pandas' CSV writer
+    pa = None
+
+
+# Non-string column labels are written as strings, as DataFrame.to_json does
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+
+def _orjson_default(obj):
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    # Same epoch-milliseconds encoding as DataFrame.to_json
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return pd.Timestamp(obj).value // 1_000_000
+    if isinstance(obj, datetime.timedelta):
+        return pd.Timedelta(obj).value // 1_000_000
+    return str(obj)
+
+
+def _arrow_csv_matches(df: pd.DataFrame) -> bool:
+    # Arrow quotes every string and formats floats, bools, nulls and datetimes
+    # differently from pandas; plain NumPy integers are written identically
+    return len(df.columns) > 0 and all(dtype.kind in "iu" for dtype in df.dtypes)
+
 
 def export_csv(df: pd.DataFrame) -> bytes:
+    if pa is not None and _arrow_csv_matches(df):
+        try:
+            buf = pa.BufferOutputStream()
+            options = pcsv.WriteOptions(include_header=False, quoting_style="needed")
+            pcsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf, options)
+            # Header from pandas so labels are quoted the same way
+            return df.iloc[:0].to_csv(index=False).encode("utf-8") + buf.getvalue().to_pybytes()
+        except (pa.ArrowException, TypeError, ValueError):
+            pass
     return df.to_csv(index=False).encode("utf-8")
 
 
 def export_json(df: pd.DataFrame) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(
+            df.to_dict(orient="records"),
+            default=_orjson_default,
+            option=orjson.OPT_INDENT_2 | _ORJSON_OPTIONS,
+        )
     return df.to_json(orient="records", indent=2).encode("utf-8")
 
 
 def export_jsonl(df: pd.DataFrame) -> bytes:
-    lines = [json.dumps(row) for row in df.to_dict(orient="records")]
+    rows = df.to_dict(orient="records")
+    if orjson is not None:
+        return b"\n".join(orjson.dumps(row, default=_orjson_default, option=_ORJSON_OPTIONS) for row in rows)
+    lines = [json.dumps(row) for row in rows]
     return "\n".join(lines).encode("utf-8")
 
 
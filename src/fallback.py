@@ -1,10 +1,30 @@
-"""Human review queue (JSON file based)."""
+"""Human review queue (JSON file per item, or a shared append-only queue.jsonl)."""
 import json
 import os
-import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator
 from src.models import HumanReviewItem
 from src.config import SystemConfig, get_config
 
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used when orjson is not installed
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: only the in-process lock guards the JSONL queue
+    fcntl = None
+
+QUEUE_JSONL = "queue.jsonl"
+_JSONL_LOCK = threading.Lock()
+
+# Queue files are small; reads overlap on IO rather than CPU
+_LOAD_WORKERS = 8
+
 
 def _ensure_dir(config: SystemConfig):
     os.makedirs(config.review_queue_dir, exist_ok=True)
@@ -14,51 +34,129 @@ def write_to_review_queue(item: HumanReviewItem, config: SystemConfig = None):
     if config is None:
         config = get_config()
     _ensure_dir(config)
-    ts = datetime.datetime.utcnow().strftime("%Y%m%d_%H%M%S_%f")
-    path = os.path.join(config.review_queue_dir, f"{item.data_id}_{ts}.json")
-    with open(path, "w") as f:
-        json.dump(item.model_dump(), f, indent=2)
+    path = os.path.join(config.review_queue_dir, f"{item.data_id}_{time.time_ns()}.json")
+    with open(path, "wb") as f:
+        f.write(item.model_dump_json(indent=2).encode("utf-8"))
+
+
+@contextmanager
+def _locked(f, exclusive: bool = True):
+    """Hold the in-process lock and an advisory flock on the open queue file."""
+    with _JSONL_LOCK:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield f
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _jsonl_path(config: SystemConfig) -> str:
+    return os.path.join(config.review_queue_dir, QUEUE_JSONL)
+
+
+def write_to_review_queue_jsonl(item: HumanReviewItem, config: SystemConfig = None):
+    """Append one item to the shared queue.jsonl instead of creating a file per item."""
+    if config is None:
+        config = get_config()
+    _ensure_dir(config)
+    line = item.model_dump_json().encode("utf-8") + b"\n"
+    with open(_jsonl_path(config), "ab") as f, _locked(f):
+        f.write(line)
+
+
+def _jsonl_lines(config: SystemConfig) -> list[bytes]:
+    path = _jsonl_path(config)
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as f, _locked(f, exclusive=False):
+        return [line for line in f.read().splitlines() if line.strip()]
+
+
+def _queue_files(config: SystemConfig) -> list[str]:
+    with os.scandir(config.review_queue_dir) as entries:
+        names = sorted(e.name for e in entries if e.name.endswith(".json"))
+    return [os.path.join(config.review_queue_dir, name) for name in names]
+
+
+def _read_json(path: str):
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except Exception:
+        return None
+
+
+def _load_item(path: str) -> HumanReviewItem | None:
+    try:
+        with open(path, "rb") as f:
+            # Parse + validate in a single pydantic-core call
+            return HumanReviewItem.model_validate_json(f.read())
+    except Exception:
+        return None
+
+
+def iter_review_queue(config: SystemConfig = None) -> Iterator[dict]:
+    """Yield raw queue entries one file at a time, without building HumanReviewItem models."""
+    if config is None:
+        config = get_config()
+    _ensure_dir(config)
+    for path in _queue_files(config):
+        data = _read_json(path)
+        if isinstance(data, dict):
+            yield data
+    for line in _jsonl_lines(config):
+        try:
+            data = orjson.loads(line) if orjson is not None else json.loads(line)
+        except Exception:
+            continue
+        if isinstance(data, dict):
+            yield data
 
 
 def load_review_queue(config: SystemConfig = None) -> list[HumanReviewItem]:
     if config is None:
         config = get_config()
     _ensure_dir(config)
+    paths = _queue_files(config)
     items = []
-    for fname in sorted(os.listdir(config.review_queue_dir)):
-        if fname.endswith(".json"):
-            path = os.path.join(config.review_queue_dir, fname)
-            try:
-                with open(path) as f:
-                    data = json.load(f)
-                items.append(HumanReviewItem(**data))
-            except Exception:
-                pass
-    return items
+    if paths:
+        with ThreadPoolExecutor(max_workers=min(_LOAD_WORKERS, len(paths))) as ex:
+            items = list(ex.map(_load_item, paths))
+    for line in _jsonl_lines(config):
+        try:
+            items.append(HumanReviewItem.model_validate_json(line))
+        except Exception:
+            continue
+    return [item for item in items if item is not None]
 
 
 def get_review_queue_summary(config: SystemConfig = None) -> dict:
-    items = load_review_queue(config)
+    total = 0
     reasons = {}
-    for item in items:
-        reasons[item.fallback_reason] = reasons.get(item.fallback_reason, 0) + 1
-    return {"total": len(items), "by_reason": reasons}
+    for data in iter_review_queue(config):
+        reason = data.get("fallback_reason")
+        total += 1
+        reasons[reason] = reasons.get(reason, 0) + 1
+    return {"total": total, "by_reason": reasons}
 
 
 def export_review_queue_to_csv(config: SystemConfig = None) -> bytes:
     import pandas as pd
-    items = load_review_queue(config)
-    if not items:
-        return b""
+    # Only a handful of fields are exported, so read raw entries instead of models
     rows = []
-    for item in items:
+    for data in iter_review_queue(config):
         rows.append({
-            "data_id": item.data_id,
-            "fallback_reason": item.fallback_reason,
-            "timestamp": item.timestamp,
-            "error_log": " | ".join(item.error_log),
-            "original_input": json.dumps(item.original_input),
+            "data_id": data.get("data_id", ""),
+            "fallback_reason": data.get("fallback_reason", ""),
+            "timestamp": data.get("timestamp", ""),
+            "error_log": " | ".join(data.get("error_log") or []),
+            "original_input": json.dumps(data.get("original_input", {})),
         })
+    if not rows:
+        return b""
     return pd.DataFrame(rows).to_csv(index=False).encode("utf-8")
 
 
@@ -69,7 +167,7 @@ def clear_review_queue(config: SystemConfig = None, confirm: bool = False):
         config = get_config()
     _ensure_dir(config)
     for fname in os.listdir(config.review_queue_dir):
-        if fname.endswith(".json"):
+        if fname.endswith(".json") or fname == QUEUE_JSONL:
             os.remove(os.path.join(config.review_queue_dir, fname))
 
 
@@ -80,3 +178,19 @@ def delete_review_item(data_id: str, config: SystemConfig = None):
     for fname in os.listdir(config.review_queue_dir):
         if fname.startswith(data_id) and fname.endswith(".json"):
             os.remove(os.path.join(config.review_queue_dir, fname))
+    path = _jsonl_path(config)
+    if os.path.exists(path):
+        with open(path, "r+b") as f, _locked(f):
+            kept = []
+            for line in f.read().splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    if HumanReviewItem.model_validate_json(line).data_id == data_id:
+                        continue
+                except Exception:
+                    pass
+                kept.append(line + b"\n")
+            f.seek(0)
+            f.writelines(kept)
+            f.truncate()
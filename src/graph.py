@@ -1,12 +1,21 @@
 """LangGraph state machine for the labeling pipeline."""
-from typing import Optional, Any
+import asyncio
+from operator import add
+from typing import Annotated, Callable, Optional, Any
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, END
 
-from src.agents import labeler_node, critic_node, validator_node, fallback_node
+from src.agents import (
+    labeler_node, critic_node, validator_node, fallback_node,
+    alabeler_node, acritic_node, alabeler_batch_node,
+)
 from src.models import LabelingTask
 from src.config import SystemConfig, get_config
 
+# Upper bound on rows marshalled into one labeler prompt — past this, latency
+# per call grows faster than the request count shrinks
+MAX_MARSHAL_K = 32
+
 
 class LabelingState(TypedDict):
     data_id: str
@@ -19,23 +28,33 @@ class LabelingState(TypedDict):
     max_retries: int
     validated_output: Optional[dict]
     fallback_to_human: bool
-    error_log: list
+    # List channels accumulate: nodes return only their new entries
+    error_log: Annotated[list, add]
     image_data: Optional[dict]
-    labeler_attempts: list
-    critic_reviews: list
+    labeler_attempts: Annotated[list, add]
+    critic_reviews: Annotated[list, add]
 
 
-def build_graph():
+def build_graph(async_nodes: bool = False):
     graph = StateGraph(LabelingState)
-    graph.add_node("labeler_node", labeler_node)
-    graph.add_node("critic_node", critic_node)
+    graph.add_node("labeler_node", alabeler_node if async_nodes else labeler_node)
+    graph.add_node("critic_node", acritic_node if async_nodes else critic_node)
     graph.add_node("validator_node", validator_node)
     graph.add_node("fallback_node", fallback_node)
-    graph.set_entry_point("labeler_node")
+    graph.set_conditional_entry_point(_entry_route, ["labeler_node", "critic_node", "validator_node"])
     return graph.compile()
 
 
+def _entry_route(state: LabelingState) -> str:
+    # States pre-labeled by the batch labeler start at the critic, or go
+    # straight to validation when the label cleared critic_skip_threshold
+    if not state.get("labeler_output"):
+        return "labeler_node"
+    return "validator_node" if state.get("critic_review") else "critic_node"
+
+
 _compiled_graph = None
+_compiled_async_graph = None
 
 
 def get_graph():
@@ -45,14 +64,15 @@ def get_graph():
     return _compiled_graph
 
 
-def run_labeling_graph(task: LabelingTask, config: SystemConfig = None) -> dict:
-    """Run the labeling pipeline for a single task. Returns validated output dict."""
-    if config is None:
-        config = get_config()
+def get_async_graph():
+    global _compiled_async_graph
+    if _compiled_async_graph is None:
+        _compiled_async_graph = build_graph(async_nodes=True)
+    return _compiled_async_graph
 
-    graph = get_graph()
 
-    initial_state: LabelingState = {
+def _initial_state(task: LabelingTask, config: SystemConfig) -> LabelingState:
+    return {
         "data_id": task.data_id,
         "input_data": {
             "text_content": task.text_content,
@@ -73,24 +93,112 @@ def run_labeling_graph(task: LabelingTask, config: SystemConfig = None) -> dict:
         "critic_reviews": [],
     }
 
+
+def _error_output(data_id: str, reasoning: str) -> dict:
+    return {
+        "data_id": data_id,
+        "label": "ERROR",
+        "confidence": 0,
+        "reasoning": reasoning,
+        "critic_confidence": 0,
+        "final_confidence": 0,
+        "retry_count": 0,
+    }
+
+
+def run_labeling_graph(task: LabelingTask, config: SystemConfig = None) -> dict:
+    """Run the labeling pipeline for a single task. Returns validated output dict."""
+    if config is None:
+        config = get_config()
+
+    return _invoke(get_graph(), _initial_state(task, config))
+
+
+def _invoke(graph, state: LabelingState) -> dict:
     try:
-        final_state = graph.invoke(initial_state)
-        return final_state.get("validated_output", {
-            "data_id": task.data_id,
-            "label": "ERROR",
-            "confidence": 0,
-            "reasoning": "Graph execution failed",
-            "critic_confidence": 0,
-            "final_confidence": 0,
-            "retry_count": 0,
-        })
+        final_state = graph.invoke(state)
+        return final_state.get("validated_output", _error_output(state["data_id"], "Graph execution failed"))
     except Exception as e:
-        return {
-            "data_id": task.data_id,
-            "label": "ERROR",
-            "confidence": 0,
-            "reasoning": f"Graph error: {str(e)}",
-            "critic_confidence": 0,
-            "final_confidence": 0,
-            "retry_count": 0,
+        return _error_output(state["data_id"], f"Graph error: {str(e)}")
+
+
+def build_labeling_pipeline(task_type: str, modality: str = "TEXT",
+                            config: SystemConfig = None) -> Callable[[str, str], dict]:
+    """
+    Resolve the graph, config and state template once for a job whose rows
+    share task_type and modality. Returns `pipeline(data_id, text) -> dict`,
+    equivalent to run_labeling_graph on the matching LabelingTask.
+    """
+    if config is None:
+        config = get_config()
+
+    graph = get_graph()
+    template = _initial_state(LabelingTask(data_id="", modality=modality, task_type=task_type), config)
+    image_path = template["input_data"]["image_path"]
+
+    def pipeline(data_id: str, text_content: str) -> dict:
+        # Only per-row fields and the mutable list channels are rebuilt
+        state = {
+            **template,
+            "data_id": data_id,
+            "input_data": {"text_content": text_content, "image_path": image_path, "modality": modality},
+            "error_log": [],
+            "labeler_attempts": [],
+            "critic_reviews": [],
         }
+        return _invoke(graph, state)
+
+    return pipeline
+
+
+async def run_labeling_graph_batch(tasks: list[LabelingTask], config: SystemConfig = None,
+                                   parallelism: int = None) -> list[dict]:
+    """
+    Run the labeling pipeline for many tasks concurrently.
+
+    LLM calls are awaited so up to `parallelism` tasks overlap their network
+    waits. Text tasks get their first label from a marshalled multi-row prompt
+    (config.labeler_marshal_k rows per call) before entering the graph at the
+    critic. Results are returned in the same order as `tasks`.
+    """
+    if config is None:
+        config = get_config()
+
+    graph = get_async_graph()
+    sem = asyncio.Semaphore(max(1, parallelism or config.labeling_parallelism))
+    states = [_initial_state(t, config) for t in tasks]
+
+    # First-pass labels: marshal up to K text tasks of the same type into one prompt
+    k = min(config.labeler_marshal_k, MAX_MARSHAL_K)
+    if k > 1:
+        groups: dict[str, list[int]] = {}
+        for i, state in enumerate(states):
+            if state["modality"] == "TEXT":
+                groups.setdefault(state["task_type"], []).append(i)
+        chunks = [idx[j:j + k] for idx in groups.values() for j in range(0, len(idx), k)]
+
+        async def _marshal(chunk: list[int]):
+            if len(chunk) < 2:
+                return
+            async with sem:
+                labeled = await alabeler_batch_node([states[i] for i in chunk])
+            for i, state in zip(chunk, labeled):
+                states[i] = state
+
+        await asyncio.gather(*[_marshal(c) for c in chunks])
+
+    async def _one(state: LabelingState) -> dict:
+        async with sem:
+            try:
+                final_state = await graph.ainvoke(state)
+                return final_state.get("validated_output", _error_output(state["data_id"], "Graph execution failed"))
+            except Exception as e:
+                return _error_output(state["data_id"], f"Graph error: {str(e)}")
+
+    # Submit grouped by task type so same-prefix prompts reach the provider back to back
+    order = sorted(range(len(states)), key=lambda i: states[i]["task_type"])
+    results = await asyncio.gather(*[_one(states[i]) for i in order])
+    outputs = [None] * len(states)
+    for i, result in zip(order, results):
+        outputs[i] = result
+    return outputs
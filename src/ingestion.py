@@ -1,5 +1,6 @@
 """CSV/JSON/JSONL data loading."""
 import io
+import json
 import pandas as pd
 
 
@@ -12,19 +13,17 @@ def load_data(uploaded_file) -> pd.DataFrame:
         if name.endswith(".csv"):
             return pd.read_csv(io.BytesIO(content), encoding="utf-8", on_bad_lines="skip")
         elif name.endswith(".jsonl"):
-            lines = content.decode("utf-8", errors="replace").strip().split("\n")
-            import json
-            records = []
-            for line in lines:
-                line = line.strip()
-                if line:
-                    try:
-                        records.append(json.loads(line))
-                    except Exception:
-                        pass
-            return pd.DataFrame(records)
+            try:
+                return pd.read_json(io.BytesIO(content), lines=True, dtype=False, convert_dates=False)
+            except ValueError:
+                # Malformed lines: fall back to per-line parsing, skipping bad lines
+                return _load_jsonl_lines(content)
         elif name.endswith(".json"):
-            import json
+            if content.lstrip()[:1] == b"[":
+                try:
+                    return pd.read_json(io.BytesIO(content), orient="records", dtype=False, convert_dates=False)
+                except ValueError:
+                    pass
             data = json.loads(content.decode("utf-8", errors="replace"))
             if isinstance(data, list):
                 return pd.DataFrame(data)
@@ -42,14 +41,28 @@ def load_data(uploaded_file) -> pd.DataFrame:
         raise ValueError(f"Failed to load file '{uploaded_file.name}': {str(e)}")
 
 
+def _load_jsonl_lines(content: bytes) -> pd.DataFrame:
+    lines = content.decode("utf-8", errors="replace").strip().split("\n")
+    records = []
+    for line in lines:
+        line = line.strip()
+        if line:
+            try:
+                records.append(json.loads(line))
+            except Exception:
+                pass
+    return pd.DataFrame(records)
+
+
 def get_text_column(df: pd.DataFrame) -> str:
     """Guess the primary text column name."""
     candidates = ["text", "content", "description", "input", "data", "sentence", "review", "comment"]
+    cols = set(df.columns)
     for col in candidates:
-        if col in df.columns:
+        if col in cols:
             return col
     # Fall back to first string column
-    for col in df.columns:
-        if df[col].dtype == object:
-            return col
+    obj_cols = df.select_dtypes(include="object").columns
+    if len(obj_cols) > 0:
+        return obj_cols[0]
     return df.columns[0] if len(df.columns) > 0 else "text"
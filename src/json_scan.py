@@ -0,0 +1,114 @@
+"""Balanced JSON span finder used by llm_utils, compiled with numba when available."""
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:  # optional: the pure-Python scanner is used instead
+    njit = None
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _scan_py(text: str, start: int) -> tuple[int, int]:
+    n = len(text)
+    i = start
+    while i < n and text[i] not in _CLOSERS:
+        i += 1
+    if i >= n:
+        return -1, -1
+
+    begin = i
+    stack = []
+    in_string = False
+    escape = False
+    while i < n:
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+        elif ch == "}" or ch == "]":
+            if not stack or stack.pop() != ch:
+                return -1, -1
+            if not stack:
+                return begin, i + 1
+        i += 1
+    return -1, -1
+
+
+if njit is not None:
+    # Code points: { } [ ] " backslash
+    _LBRACE, _RBRACE, _LBRACK, _RBRACK, _QUOTE, _BSLASH = 123, 125, 91, 93, 34, 92
+
+    @njit(cache=True)
+    def _scan_codes(codes, start):
+        n = codes.shape[0]
+        i = start
+        while i < n and codes[i] != _LBRACE and codes[i] != _LBRACK:
+            i += 1
+        if i >= n:
+            return -1, -1
+
+        begin = i
+        stack = np.empty(n - i, dtype=np.uint32)
+        depth = 0
+        in_string = False
+        escape = False
+        while i < n:
+            ch = codes[i]
+            if in_string:
+                if escape:
+                    escape = False
+                elif ch == _BSLASH:
+                    escape = True
+                elif ch == _QUOTE:
+                    in_string = False
+            elif ch == _QUOTE:
+                in_string = True
+            elif ch == _LBRACE:
+                stack[depth] = _RBRACE
+                depth += 1
+            elif ch == _LBRACK:
+                stack[depth] = _RBRACK
+                depth += 1
+            elif ch == _RBRACE or ch == _RBRACK:
+                if depth == 0 or stack[depth - 1] != ch:
+                    return -1, -1
+                depth -= 1
+                if depth == 0:
+                    return begin, i + 1
+            i += 1
+        return -1, -1
+else:
+    _scan_codes = None
+
+
+def encode_text(text: str):
+    """
+    One code point per element, so indices line up with `text` indices.
+    Encode once and pass to find_json_span when scanning the same text repeatedly.
+    Returns None when numba is not installed.
+    """
+    if _scan_codes is None:
+        return None
+    return np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+
+
+def find_json_span(text: str, start: int = 0, codes=None) -> tuple[int, int]:
+    """
+    Single pass over `text` from `start`: locate the first `{` or `[` and return
+    (begin, end) of its balanced span, skipping brackets inside JSON strings.
+    Returns (-1, -1) if no opener is found or it is never closed.
+    """
+    if _scan_codes is None:
+        return _scan_py(text, start)
+    if codes is None:
+        codes = encode_text(text)
+    begin, end = _scan_codes(codes, start)
+    return int(begin), int(end)
@@ -1,7 +1,64 @@
 """Shared LLM call wrapper and robust JSON parsing."""
 import re
 import json
+from openai import APIConnectionError, APITimeoutError, RateLimitError
+from pydantic import BaseModel
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 from src.config import get_config, get_llm
+from src.json_scan import encode_text, find_json_span
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used when orjson is not installed
+    orjson = None
+
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*([\s\S]+?)```")
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+# Only transient provider errors are retried; anything else fails on the first attempt
+_llm_retry = retry(
+    retry=retry_if_exception_type((RateLimitError, APITimeoutError, APIConnectionError)),
+    wait=wait_exponential_jitter(initial=1, max=20),
+    stop=stop_after_attempt(3),
+    reraise=True,
+)
+
+
+@_llm_retry
+def invoke_with_retry(llm, messages: list):
+    """llm.invoke with exponential backoff on rate limits, timeouts and connection errors."""
+    return llm.invoke(messages)
+
+
+@_llm_retry
+async def ainvoke_with_retry(llm, messages: list):
+    """Async variant of invoke_with_retry."""
+    return await llm.ainvoke(messages)
+
+
+def _validate(content: str, model_cls: type[BaseModel]) -> BaseModel | None:
+    parsed = parse_llm_json(content)
+    if not parsed:
+        return None
+    return model_cls.model_validate(parsed)
+
+
+def call_and_parse(llm, messages: list, model_cls: type[BaseModel]) -> BaseModel | None:
+    """
+    Call the LLM (retrying transient errors) and validate its JSON reply as model_cls.
+
+    Returns None if no JSON could be extracted. Non-retryable call errors and
+    validation errors are raised for the caller to record.
+    """
+    response = invoke_with_retry(llm, messages)
+    return _validate(response.content, model_cls)
+
+
+async def acall_and_parse(llm, messages: list, model_cls: type[BaseModel]) -> BaseModel | None:
+    """Async variant of call_and_parse."""
+    response = await ainvoke_with_retry(llm, messages)
+    return _validate(response.content, model_cls)
 
 
 def call_llm(prompt: str, config=None) -> str:
@@ -11,12 +68,51 @@ def call_llm(prompt: str, config=None) -> str:
     try:
         llm = get_llm(config.labeler_model)
         from langchain_core.messages import HumanMessage
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = invoke_with_retry(llm, [HumanMessage(content=prompt)])
         return response.content
     except Exception as e:
         return f"[LLM ERROR: {str(e)}]"
 
 
+def _loads(text: str):
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # stdlib also accepts NaN/Infinity and arbitrarily large ints
+    return json.loads(text)
+
+
+def _parse_first_json(text: str):
+    """
+    Parse balanced JSON spans in order of appearance. Objects win over arrays
+    (an array is only returned if no object follows it), matching the old
+    object-then-array regex order.
+    """
+    first_array = None
+    codes = encode_text(text)
+    pos = 0
+    while True:
+        begin, end = find_json_span(text, pos, codes)
+        if begin < 0:
+            # Unbalanced from here on — move past the opener and keep looking
+            nxt = min((j for j in (text.find("{", pos), text.find("[", pos)) if j >= 0), default=-1)
+            if nxt < 0:
+                return first_array
+            pos = nxt + 1
+            continue
+        try:
+            parsed = _loads(text[begin:end])
+        except Exception:
+            pos = begin + 1
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+        if first_array is None:
+            first_array = parsed
+        pos = end
+
+
 def parse_llm_json(response_text: str) -> dict | None:
     """
     Robustly extract JSON from LLM response.
@@ -29,41 +125,28 @@ def parse_llm_json(response_text: str) -> dict | None:
 
     # 1. Direct parse
     try:
-        return json.loads(text)
+        return _loads(text)
     except Exception:
         pass
 
     # 2. Markdown code block: ```json ... ``` or ``` ... ```
-    match = re.search(r"```(?:json)?\s*([\s\S]+?)```", text)
+    match = _FENCE_RE.search(text)
     if match:
         try:
-            return json.loads(match.group(1).strip())
+            return _loads(match.group(1).strip())
         except Exception:
             pass
 
-    # 3. First complete JSON object {...}
-    match = re.search(r"\{[\s\S]+\}", text)
-    if match:
-        try:
-            return json.loads(match.group(0))
-        except Exception:
-            pass
-
-    # 4. First complete JSON array [...]
-    match = re.search(r"\[[\s\S]+\]", text)
-    if match:
-        try:
-            return json.loads(match.group(0))
-        except Exception:
-            pass
+    # 3. First balanced JSON object {...} or array [...]
+    parsed = _parse_first_json(text)
+    if parsed is not None:
+        return parsed
 
-    # 5. Try fixing common LLM JSON mistakes (trailing commas, single quotes)
+    # 4. Try fixing common LLM JSON mistakes (trailing commas, single quotes)
     try:
-        cleaned = re.sub(r",\s*([}\]])", r"\1", text)  # trailing commas
+        cleaned = _TRAILING_COMMA_RE.sub(r"\1", text)  # trailing commas
         cleaned = cleaned.replace("'", '"')  # single quotes
-        match = re.search(r"\{[\s\S]+\}", cleaned)
-        if match:
-            return json.loads(match.group(0))
+        return _parse_first_json(cleaned)
     except Exception:
         pass
 
@@ -1,4 +1,5 @@
 """PDF paper parsing with PyMuPDF."""
+import io
 import re
 import fitz  # PyMuPDF
 
@@ -13,6 +14,12 @@ SECTION_HEADERS = {
     "references": r"\breferences?\b",
 }
 
+# Header must sit near a line start: at most a short prefix (e.g. "I." or "2 ") before it
+_SECTION_RES = {
+    section: re.compile(rf"^[^\S\n]*[^\n]{{0,9}}?(?P<header>{pattern})", re.IGNORECASE | re.MULTILINE)
+    for section, pattern in SECTION_HEADERS.items()
+}
+
 
 def ingest_paper(uploaded_file) -> dict:
     """
@@ -30,15 +37,17 @@ def ingest_paper(uploaded_file) -> dict:
     try:
         raw_bytes = uploaded_file.read()
         doc = fitz.open(stream=raw_bytes, filetype="pdf")
-        pages_text = []
+        # Stream page text into one buffer rather than holding a list of page strings
+        buf = io.StringIO()
         for page in doc:
             try:
-                pages_text.append(page.get_text())
+                buf.write(page.get_text())
             except Exception:
-                pages_text.append("")
+                pass
+            buf.write("\n")
         doc.close()
 
-        full_text = "\n".join(pages_text).strip()
+        full_text = buf.getvalue().strip()
     except Exception as e:
         # Graceful fallback for bad PDFs
         name = getattr(uploaded_file, "name", "unknown.pdf")
@@ -83,20 +92,13 @@ def _extract_title(text: str, filename: str) -> str:
 def _split_sections(text: str) -> dict:
     """Split text into sections by header detection."""
     sections = {}
-    lower_text = text.lower()
 
     # Find positions of all section headers
     found = {}
-    for section, pattern in SECTION_HEADERS.items():
-        for m in re.finditer(pattern, lower_text, re.IGNORECASE | re.MULTILINE):
-            # Only consider matches near line starts
-            start = m.start()
-            line_start = text.rfind("\n", 0, start)
-            prefix = text[line_start:start].strip()
-            if len(prefix) < 10:  # Close to line start
-                if section not in found or found[section] > start:
-                    found[section] = start
-                break
+    for section, rx in _SECTION_RES.items():
+        m = rx.search(text)
+        if m:
+            found[section] = m.start("header")
 
     # Sort by position
     sorted_sections = sorted(found.items(), key=lambda x: x[1])
@@ -1,7 +1,12 @@
 """Academic paper search via Semantic Scholar + OpenAlex fallback."""
 import os
+from concurrent.futures import ThreadPoolExecutor
 import requests
 
+# Shared session: keep-alive connections are reused across searches
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "PaperTrail/1.0"})
+
 
 def search_papers(query: str, limit: int = 8) -> list[dict]:
     """
@@ -16,6 +21,14 @@ def search_papers(query: str, limit: int = 8) -> list[dict]:
     return results
 
 
+def search_papers_batch(queries: list[str], limit: int = 8, max_workers: int = 4) -> list[list[dict]]:
+    """Run search_papers for several queries concurrently. Results keep query order."""
+    if not queries:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(queries))) as ex:
+        return list(ex.map(lambda q: search_papers(q, limit), queries))
+
+
 def _search_semantic_scholar(query: str, limit: int) -> list[dict]:
     url = "https://api.semanticscholar.org/graph/v1/paper/search"
     params = {
@@ -29,7 +42,7 @@ def _search_semantic_scholar(query: str, limit: int) -> list[dict]:
         headers["x-api-key"] = api_key
 
     try:
-        resp = requests.get(url, params=params, headers=headers, timeout=10)
+        resp = _SESSION.get(url, params=params, headers=headers, timeout=10)
         resp.raise_for_status()
         data = resp.json()
         papers = []
@@ -62,7 +75,7 @@ def _search_openalex(query: str, limit: int) -> list[dict]:
         params["mailto"] = email
 
     try:
-        resp = requests.get(url, params=params, timeout=10)
+        resp = _SESSION.get(url, params=params, timeout=10)
         resp.raise_for_status()
         data = resp.json()
         papers = []
@@ -94,10 +107,11 @@ def _reconstruct_abstract(inverted_index: dict | None) -> str:
     if not inverted_index:
         return ""
     try:
-        positions = {}
+        max_pos = max((p for pos_list in inverted_index.values() for p in pos_list), default=-1)
+        words = [""] * (max_pos + 1)
         for word, pos_list in inverted_index.items():
             for pos in pos_list:
-                positions[pos] = word
-        return " ".join(positions[i] for i in sorted(positions.keys()))
+                words[pos] = word
+        return " ".join(w for w in words if w)
     except Exception:
         return ""
@@ -2,13 +2,46 @@
 import io
 from PIL import Image
 
+# Refuse decompression bombs before any pixels are decoded (Pillow's own default)
+MAX_IMAGE_PIXELS = 89_478_485
 
-def resize_image(image_bytes: bytes, max_size: int = 1024) -> bytes:
-    """Resize image to fit within max_size x max_size while preserving aspect ratio."""
-    img = Image.open(io.BytesIO(image_bytes))
-    img.thumbnail((max_size, max_size), Image.LANCZOS)
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
+
+def _encodable(img: Image.Image, fmt: str) -> Image.Image:
+    """Convert to a mode the target encoder accepts."""
+    if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+        return img.convert("RGB")
+    if fmt == "WEBP" and img.mode not in ("RGB", "RGBA"):
+        has_alpha = img.mode in ("LA", "PA") or "transparency" in img.info
+        return img.convert("RGBA" if has_alpha else "RGB")
+    return img
+
+
+def resize_image(image_bytes: bytes, max_size: int = 1024, fmt: str = "WEBP", quality: int = 85) -> bytes:
+    """
+    Resize image to fit within max_size x max_size while preserving aspect ratio.
+
+    Output is WebP by default, which encodes far faster than PNG; pass
+    fmt="JPEG" for photographs or fmt="PNG" for lossless output.
+    """
+    fmt = fmt.upper()
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        if img.width * img.height > MAX_IMAGE_PIXELS:
+            raise ValueError(f"Image too large: {img.width}x{img.height} pixels")
+        # JPEG sources decode straight at a reduced DCT scale instead of full resolution
+        img.draft("RGB", (max_size, max_size))
+        # reducing_gap: an integer BOX reduce() first brings the image to within 2x
+        # of the target, so LANCZOS only runs on the final small step
+        img.thumbnail((max_size, max_size), Image.LANCZOS, reducing_gap=2.0)
+        img.load()
+        out = _encodable(img, fmt)
+
+        buf = io.BytesIO()
+        if fmt == "WEBP":
+            out.save(buf, format="WEBP", quality=quality, method=4)
+        elif fmt == "JPEG":
+            out.save(buf, format="JPEG", quality=quality)
+        else:
+            out.save(buf, format=fmt)
     return buf.getvalue()
 
 
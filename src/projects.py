@@ -3,9 +3,24 @@ import json
 import os
 import shutil
 import sqlite3
+import time
 import uuid
-from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import cached_property
+
+from src.db.pool import apply_pragmas, get_connection, init_pool
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used when orjson is not installed
+    orjson = None
+
+try:
+    import pyarrow  # noqa: F401  (pandas' parquet engine)
+    _HAS_PYARROW = True
+except ImportError:  # optional: dataframe artifacts are stored as CSV instead
+    _HAS_PYARROW = False
 
 
 _ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
@@ -30,14 +45,31 @@ class ProjectArtifact:
     name: str
     filename: str
     created_at: str
-    metadata: dict = field(default_factory=dict)
+    metadata_json: str = "{}"
+
+    @cached_property
+    def metadata(self) -> dict:
+        # Decoded on first access; listing artifacts never pays for it.
+        # Assigning artifact.metadata still works and replaces the cached value.
+        return _loads(self.metadata_json or "{}")
+
+
+def _dumps(obj) -> str:
+    """Compact JSON text for DB columns."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+
+def _loads(raw):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
 
 def get_db() -> sqlite3.Connection:
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
+    apply_pragmas(conn)
     return conn
 
 
@@ -62,6 +94,9 @@ def init_db():
                 metadata_json TEXT DEFAULT '{}',
                 FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
             );
+            CREATE INDEX IF NOT EXISTS idx_artifacts_project_created ON artifacts(project_id, created_at DESC);
+            CREATE INDEX IF NOT EXISTS idx_artifacts_project_type ON artifacts(project_id, artifact_type);
+            CREATE INDEX IF NOT EXISTS idx_projects_updated ON projects(updated_at DESC);
         """)
         conn.commit()
     finally:
@@ -72,53 +107,63 @@ def _project_dir(project_id: str) -> str:
     return os.path.join(PROJECTS_DIR, project_id)
 
 
+_iso_second = (-1, "")
+
+
 def _now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    """UTC timestamp as `YYYY-MM-DDTHH:MM:SS.ffffff+00:00`; the seconds part is formatted once per second."""
+    global _iso_second
+    sec, us = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_sec, prefix = _iso_second
+    if sec != cached_sec:
+        # Swap the whole tuple so concurrent callers never see a mismatched pair
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+        _iso_second = (sec, prefix)
+    return f"{prefix}.{us:06d}+00:00"
 
 
 def _short_uuid() -> str:
     return str(uuid.uuid4())[:8]
 
 
+@contextmanager
+def _write_transaction():
+    """Pooled connection inside BEGIN IMMEDIATE; commits once on exit, rolls back on error."""
+    with get_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
+        conn.commit()
+
+
 def create_project(name: str, description: str = "") -> ProjectMetadata:
     pid = _short_uuid()
     now = _now_iso()
 
     os.makedirs(_project_dir(pid), exist_ok=True)
 
-    conn = get_db()
-    try:
+    with _write_transaction() as conn:
         conn.execute(
             "INSERT INTO projects (id, name, description, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
             (pid, name, description, now, now),
         )
-        conn.commit()
-    finally:
-        conn.close()
 
     return ProjectMetadata(id=pid, name=name, description=description, created_at=now, updated_at=now)
 
 
 def list_projects() -> list[ProjectMetadata]:
-    conn = get_db()
-    try:
+    with get_connection() as conn:
         rows = conn.execute("SELECT * FROM projects ORDER BY updated_at DESC").fetchall()
         return [ProjectMetadata(id=r["id"], name=r["name"], description=r["description"],
                                 created_at=r["created_at"], updated_at=r["updated_at"]) for r in rows]
-    finally:
-        conn.close()
 
 
 def get_project(project_id: str) -> ProjectMetadata | None:
-    conn = get_db()
-    try:
+    with get_connection() as conn:
         row = conn.execute("SELECT * FROM projects WHERE id = ?", (project_id,)).fetchone()
         if row is None:
             return None
         return ProjectMetadata(id=row["id"], name=row["name"], description=row["description"],
                                created_at=row["created_at"], updated_at=row["updated_at"])
-    finally:
-        conn.close()
 
 
 def update_project(project_id: str, name: str = None, description: str = None) -> ProjectMetadata | None:
@@ -139,24 +184,16 @@ def update_project(project_id: str, name: str = None, description: str = None) -
     params.append(now)
     params.append(project_id)
 
-    conn = get_db()
-    try:
+    with _write_transaction() as conn:
         conn.execute(f"UPDATE projects SET {', '.join(updates)} WHERE id = ?", params)
-        conn.commit()
-    finally:
-        conn.close()
 
     return get_project(project_id)
 
 
 def delete_project(project_id: str) -> bool:
-    conn = get_db()
-    try:
+    with _write_transaction() as conn:
         cursor = conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
-        conn.commit()
         deleted = cursor.rowcount > 0
-    finally:
-        conn.close()
 
     pdir = _project_dir(project_id)
     if os.path.isdir(pdir):
@@ -165,106 +202,127 @@ def delete_project(project_id: str) -> bool:
     return deleted
 
 
-def save_artifact(project_id: str, artifact_type: str, name: str, data: dict, metadata: dict = None) -> ProjectArtifact:
-    pdir = _project_dir(project_id)
-    os.makedirs(pdir, exist_ok=True)
-
-    aid = _short_uuid()
-    filename = f"{artifact_type}_{aid}.json"
-    filepath = os.path.join(pdir, filename)
+_INSERT_ARTIFACT = (
+    "INSERT INTO artifacts (id, project_id, artifact_type, name, filename, created_at, metadata_json) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
 
-    with open(filepath, "w") as f:
-        json.dump(data, f, indent=2, default=str)
 
+def _record_artifacts(project_id: str, entries: list[tuple]) -> list[ProjectArtifact]:
+    """Insert (id, artifact_type, name, filename, metadata) rows whose files are already written."""
     now = _now_iso()
-    meta_json = json.dumps(metadata or {})
+    rows = [(aid, project_id, atype, name, filename, now, _dumps(meta or {}))
+            for aid, atype, name, filename, meta in entries]
 
-    conn = get_db()
-    try:
-        conn.execute(
-            "INSERT INTO artifacts (id, project_id, artifact_type, name, filename, created_at, metadata_json) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (aid, project_id, artifact_type, name, filename, now, meta_json),
-        )
+    with _write_transaction() as conn:
+        conn.executemany(_INSERT_ARTIFACT, rows)
         conn.execute("UPDATE projects SET updated_at = ? WHERE id = ?", (now, project_id))
-        conn.commit()
-    finally:
-        conn.close()
 
-    return ProjectArtifact(id=aid, project_id=project_id, artifact_type=artifact_type,
-                           name=name, filename=filename, created_at=now, metadata=metadata or {})
+    artifacts = []
+    for (aid, atype, name, filename, meta), row in zip(entries, rows):
+        artifact = ProjectArtifact(id=aid, project_id=project_id, artifact_type=atype,
+                                   name=name, filename=filename, created_at=now, metadata_json=row[6])
+        artifact.metadata = meta or {}
+        artifacts.append(artifact)
+    return artifacts
 
 
-def save_dataframe_artifact(project_id: str, artifact_type: str, name: str, df, metadata: dict = None) -> ProjectArtifact:
+def save_artifacts_bulk(project_id: str, items: list[dict]) -> list[ProjectArtifact]:
+    """
+    Save several JSON artifacts with one transaction.
+
+    Each item has "artifact_type", "name", "data" and optionally "metadata".
+    All files are written first; the single DB commit is what makes them visible.
+    """
     pdir = _project_dir(project_id)
     os.makedirs(pdir, exist_ok=True)
 
-    aid = _short_uuid()
-    filename = f"{artifact_type}_{aid}.csv"
-    filepath = os.path.join(pdir, filename)
+    entries = []
+    for item in items:
+        aid = _short_uuid()
+        filename = f"{item['artifact_type']}_{aid}.json"
+        with open(os.path.join(pdir, filename), "w") as f:
+            json.dump(item["data"], f, indent=2, default=str)
+        entries.append((aid, item["artifact_type"], item["name"], filename, item.get("metadata")))
 
-    df.to_csv(filepath, index=False)
+    return _record_artifacts(project_id, entries)
 
-    now = _now_iso()
-    meta_json = json.dumps(metadata or {})
 
-    conn = get_db()
-    try:
-        conn.execute(
-            "INSERT INTO artifacts (id, project_id, artifact_type, name, filename, created_at, metadata_json) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (aid, project_id, artifact_type, name, filename, now, meta_json),
-        )
-        conn.execute("UPDATE projects SET updated_at = ? WHERE id = ?", (now, project_id))
-        conn.commit()
-    finally:
-        conn.close()
+def save_artifact(project_id: str, artifact_type: str, name: str, data: dict, metadata: dict = None) -> ProjectArtifact:
+    return save_artifacts_bulk(project_id, [
+        {"artifact_type": artifact_type, "name": name, "data": data, "metadata": metadata},
+    ])[0]
+
+
+def save_dataframe_artifact(project_id: str, artifact_type: str, name: str, df, metadata: dict = None) -> ProjectArtifact:
+    pdir = _project_dir(project_id)
+    os.makedirs(pdir, exist_ok=True)
 
-    return ProjectArtifact(id=aid, project_id=project_id, artifact_type=artifact_type,
-                           name=name, filename=filename, created_at=now, metadata=metadata or {})
+    aid = _short_uuid()
+    filename = _write_dataframe(df, pdir, f"{artifact_type}_{aid}")
+
+    # Shape in metadata lets the viewer summarize without loading the file
+    meta = {**(metadata or {}), "rows": len(df), "columns": [str(c) for c in df.columns]}
+    return _record_artifacts(project_id, [(aid, artifact_type, name, filename, meta)])[0]
+
+
+def _write_dataframe(df, pdir: str, stem: str) -> str:
+    """Write `df` as zstd Parquet, or CSV when pyarrow is missing or rejects the frame. Returns the filename."""
+    if _HAS_PYARROW:
+        filename = f"{stem}.parquet"
+        filepath = os.path.join(pdir, filename)
+        try:
+            df.to_parquet(filepath, engine="pyarrow", compression="zstd", index=False)
+            return filename
+        except Exception:
+            # e.g. mixed-type object columns Arrow can't infer
+            if os.path.exists(filepath):
+                os.remove(filepath)
+    filename = f"{stem}.csv"
+    df.to_csv(os.path.join(pdir, filename), index=False)
+    return filename
 
 
 def load_artifacts(project_id: str) -> list[ProjectArtifact]:
-    conn = get_db()
-    try:
+    with get_connection() as conn:
         rows = conn.execute(
             "SELECT * FROM artifacts WHERE project_id = ? ORDER BY created_at DESC", (project_id,)
         ).fetchall()
         return [ProjectArtifact(
             id=r["id"], project_id=r["project_id"], artifact_type=r["artifact_type"],
             name=r["name"], filename=r["filename"], created_at=r["created_at"],
-            metadata=json.loads(r["metadata_json"] or "{}"),
+            metadata_json=r["metadata_json"] or "{}",
         ) for r in rows]
-    finally:
-        conn.close()
 
 
 def load_artifact_data(project_id: str, artifact: ProjectArtifact):
     filepath = os.path.join(_project_dir(project_id), artifact.filename)
     if not os.path.isfile(filepath):
         return None
+    if artifact.filename.endswith(".parquet"):
+        import pandas as pd
+        return pd.read_parquet(filepath, engine="pyarrow")
     if artifact.filename.endswith(".csv"):
         import pandas as pd
         return pd.read_csv(filepath)
     else:
+        # Written by json.dump, which may emit NaN/Infinity; orjson rejects those
         with open(filepath) as f:
             return json.load(f)
 
 
 def get_project_stats(project_id: str) -> dict:
-    conn = get_db()
-    try:
+    with get_connection() as conn:
         rows = conn.execute(
             "SELECT artifact_type, COUNT(*) as count FROM artifacts WHERE project_id = ? GROUP BY artifact_type",
             (project_id,),
         ).fetchall()
         artifact_types = {r["artifact_type"]: r["count"] for r in rows}
         return {"artifact_count": sum(artifact_types.values()), "artifact_types": artifact_types}
-    finally:
-        conn.close()
 
 
 def get_recent_projects(limit: int = 3) -> list[dict]:
-    conn = get_db()
-    try:
+    with get_connection() as conn:
         rows = conn.execute("""
             SELECT p.*, COUNT(a.id) as artifact_count
             FROM projects p
@@ -274,9 +332,8 @@ def get_recent_projects(limit: int = 3) -> list[dict]:
             LIMIT ?
         """, (limit,)).fetchall()
         return [dict(r) for r in rows]
-    finally:
-        conn.close()
 
 
-# Initialize database on import
+# Initialize database and connection pool on import
 init_db()
+init_pool(DB_PATH, min_size=2, max_size=8)
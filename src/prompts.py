@@ -1,102 +1,148 @@
 """Prompt templates for all task types."""
+from functools import lru_cache
+
+
+# Per-task labeling instructions: (role, instruction, input label, label placeholder)
+LABELING_INSTRUCTIONS = {
+    "ner": (
+        "You are a Named Entity Recognition (NER) expert.",
+        "Label the primary named entity type in the following text.\n"
+        "Choose one of: PERSON, ORGANIZATION, LOCATION, DATE, PRODUCT, EVENT, OTHER",
+        "Text", "ENTITY_TYPE",
+    ),
+    "sentiment": (
+        "You are a sentiment analysis expert.",
+        "Classify the sentiment of the following text.\n"
+        "Choose one of: POSITIVE, NEGATIVE, NEUTRAL, MIXED",
+        "Text", "SENTIMENT",
+    ),
+    "summarization": (
+        "You are a text summarization expert.",
+        "Create a concise label/category for the following text based on its main topic.\n"
+        "Choose one of: TECHNICAL, SCIENTIFIC, NEWS, OPINION, NARRATIVE, INSTRUCTIONAL, OTHER",
+        "Text", "CATEGORY",
+    ),
+    "object_detection": (
+        "You are a computer vision expert describing image content.",
+        "Label the primary object or scene type described.\n"
+        "Choose one of: PERSON, VEHICLE, ANIMAL, BUILDING, FOOD, NATURE, OBJECT, SCENE",
+        "Description/Text", "CATEGORY",
+    ),
+    "ocr": (
+        "You are an OCR classification expert.",
+        "Classify the type of document or text in the following content.\n"
+        "Choose one of: HANDWRITTEN, PRINTED, MIXED, FORM, TABLE, RECEIPT, LABEL, OTHER",
+        "Text", "DOCUMENT_TYPE",
+    ),
+    "visual_qa": (
+        "You are a visual question answering expert.",
+        "Answer the question based on the provided context.",
+        "Context", "YOUR_ANSWER",
+    ),
+    "captioning": (
+        "You are an image captioning expert.",
+        "Generate a concise label/category for the content described.\n"
+        "Choose one of: PORTRAIT, LANDSCAPE, ACTION, GROUP, PRODUCT, ABSTRACT, DOCUMENTARY",
+        "Content", "CAPTION_TYPE",
+    ),
+    "grounded_description": (
+        "You are a visual grounding expert.",
+        "Classify the description type and identify key regions.",
+        "Content", "DESCRIPTION_TYPE",
+    ),
+}
+
+
+# Plain str.format templates (not f-strings); literal JSON braces are doubled
+_LABELING_SYSTEM_TEMPLATE = """{role}
+
+{instruction}
+
+Return ONLY valid JSON: {{"label": "{label_hint}", "confidence": 85, "reasoning": "brief explanation", "bounding_boxes": []}}"""
+
+_BATCH_SYSTEM_TEMPLATE = """{role}
+
+{instruction}
+Label each of the items you are given independently.
+
+Return ONLY a valid JSON array with one object per item, in the same order as the items:
+[{{"label": "{label_hint}", "confidence": 85, "reasoning": "brief explanation"}}, ...]"""
+
+_FEEDBACK_TEMPLATE = """PREVIOUS ATTEMPT FEEDBACK (incorporate this into your new label):
+{feedback}
 
-
-def get_labeling_prompt(task_type: str, text_content: str, critic_feedback: str = "") -> str:
-    feedback_block = ""
-    if critic_feedback:
-        feedback_block = f"""
-PREVIOUS ATTEMPT FEEDBACK (incorporate this into your new label):
-{critic_feedback}
 """
 
-    prompts = {
-        "ner": f"""You are a Named Entity Recognition (NER) expert.
-{feedback_block}
-Label the primary named entity type in the following text.
-Choose one of: PERSON, ORGANIZATION, LOCATION, DATE, PRODUCT, EVENT, OTHER
-
-Text: {text_content}
-
-Return ONLY valid JSON: {{"label": "ENTITY_TYPE", "confidence": 85, "reasoning": "brief explanation", "bounding_boxes": []}}""",
-
-        "sentiment": f"""You are a sentiment analysis expert.
-{feedback_block}
-Classify the sentiment of the following text.
-Choose one of: POSITIVE, NEGATIVE, NEUTRAL, MIXED
-
-Text: {text_content}
-
-Return ONLY valid JSON: {{"label": "SENTIMENT", "confidence": 85, "reasoning": "brief explanation", "bounding_boxes": []}}""",
-
-        "summarization": f"""You are a text summarization expert.
-{feedback_block}
-Create a concise label/category for the following text based on its main topic.
-Choose one of: TECHNICAL, SCIENTIFIC, NEWS, OPINION, NARRATIVE, INSTRUCTIONAL, OTHER
-
-Text: {text_content}
-
-Return ONLY valid JSON: {{"label": "CATEGORY", "confidence": 85, "reasoning": "brief explanation", "bounding_boxes": []}}""",
-
-        "object_detection": f"""You are a computer vision expert describing image content.
-{feedback_block}
-Label the primary object or scene type described.
-Choose one of: PERSON, VEHICLE, ANIMAL, BUILDING, FOOD, NATURE, OBJECT, SCENE
-
-Description/Text: {text_content}
-
-Return ONLY valid JSON: {{"label": "CATEGORY", "confidence": 85, "reasoning": "brief explanation", "bounding_boxes": []}}""",
-
-        "ocr": f"""You are an OCR classification expert.
-{feedback_block}
-Classify the type of document or text in the following content.
-Choose one of: HANDWRITTEN, PRINTED, MIXED, FORM, TABLE, RECEIPT, LABEL, OTHER
-
-Text: {text_content}
-
-Return ONLY valid JSON: {{"label": "DOCUMENT_TYPE", "confidence": 85, "reasoning": "brief explanation", "bounding_boxes": []}}""",
-
-        "visual_qa": f"""You are a visual question answering expert.
-{feedback_block}
-Answer the question based on the provided context.
+_LABELING_USER_TEMPLATE = "{feedback}{input_label}: {text}"
 
-Context: {text_content}
-
-Return ONLY valid JSON: {{"label": "YOUR_ANSWER", "confidence": 85, "reasoning": "brief explanation", "bounding_boxes": []}}""",
-
-        "captioning": f"""You are an image captioning expert.
-{feedback_block}
-Generate a concise label/category for the content described.
-Choose one of: PORTRAIT, LANDSCAPE, ACTION, GROUP, PRODUCT, ABSTRACT, DOCUMENTARY
-
-Content: {text_content}
-
-Return ONLY valid JSON: {{"label": "CAPTION_TYPE", "confidence": 85, "reasoning": "brief explanation", "bounding_boxes": []}}""",
-
-        "grounded_description": f"""You are a visual grounding expert.
-{feedback_block}
-Classify the description type and identify key regions.
-
-Content: {text_content}
-
-Return ONLY valid JSON: {{"label": "DESCRIPTION_TYPE", "confidence": 85, "reasoning": "brief explanation", "bounding_boxes": []}}""",
-    }
-
-    return prompts.get(task_type.lower(), prompts["sentiment"])
-
-
-def get_critic_prompt(task_type: str, original_input: str, labeler_output: dict, rubric: dict) -> str:
-    rubric_text = ""
-    if rubric:
-        criteria = rubric.get("criteria", [])
-        rubric_text = "Evaluation criteria:\n" + "\n".join(f"- {c}" for c in criteria)
-
-    return f"""You are a label quality critic. Evaluate whether this label is correct.
+_CRITIC_SYSTEM_TEMPLATE = """You are a label quality critic. Evaluate whether this label is correct.
 Do NOT re-label. Only judge correctness.
 
 Task type: {task_type}
-Original input: {original_input}
-Proposed label: {labeler_output.get('label', '')}
-Reasoning: {labeler_output.get('reasoning', '')}
 {rubric_text}
 
 Return ONLY valid JSON: {{"is_correct": true/false, "confidence_score": 85, "critique": "specific feedback if incorrect, or 'Label is correct' if correct"}}"""
+
+_CRITIC_USER_TEMPLATE = """Original input: {text}
+Proposed label: {label}
+Reasoning: {reasoning}"""
+
+# System prompts depend only on the task type, so build them once at import
+_LABELING_SYSTEM = {
+    task: _LABELING_SYSTEM_TEMPLATE.format(role=role, instruction=instruction, label_hint=label_hint)
+    for task, (role, instruction, _, label_hint) in LABELING_INSTRUCTIONS.items()
+}
+_BATCH_SYSTEM = {
+    task: _BATCH_SYSTEM_TEMPLATE.format(role=role, instruction=instruction, label_hint=label_hint)
+    for task, (role, instruction, _, label_hint) in LABELING_INSTRUCTIONS.items()
+}
+
+
+def _task_key(task_type: str) -> str:
+    task = task_type.lower()
+    return task if task in LABELING_INSTRUCTIONS else "sentiment"
+
+
+def get_labeling_prompt(task_type: str, text_content: str, critic_feedback: str = "") -> tuple[str, str]:
+    """
+    Returns (system, user) prompt text.
+
+    The system part depends only on task_type so providers can reuse the
+    cached prefix across calls; the input and any critic feedback go last.
+    """
+    task = _task_key(task_type)
+    feedback_block = _FEEDBACK_TEMPLATE.format(feedback=critic_feedback) if critic_feedback else ""
+    user = _LABELING_USER_TEMPLATE.format(
+        feedback=feedback_block, input_label=LABELING_INSTRUCTIONS[task][2], text=text_content
+    )
+    return _LABELING_SYSTEM[task], user
+
+
+def get_labeling_prompt_batch(task_type: str, items: list[tuple[str, str]]) -> tuple[str, str]:
+    """(system, user) prompt for labeling several (data_id, text) items of one task type in a single call."""
+    task = _task_key(task_type)
+    input_label = LABELING_INSTRUCTIONS[task][2]
+    blocks = "\n\n".join(
+        f"[ITEM {i + 1}] id={data_id}\n{input_label}: {text}" for i, (data_id, text) in enumerate(items)
+    )
+    return _BATCH_SYSTEM[task], f"{blocks}\n\nReturn a JSON array of length {len(items)}."
+
+
+@lru_cache(maxsize=64)
+def _critic_system(task_type: str, criteria: tuple) -> str:
+    rubric_text = ""
+    if criteria is not None:
+        rubric_text = "Evaluation criteria:\n" + "\n".join(f"- {c}" for c in criteria)
+    return _CRITIC_SYSTEM_TEMPLATE.format(task_type=task_type, rubric_text=rubric_text)
+
+
+def get_critic_prompt(task_type: str, original_input: str, labeler_output: dict, rubric: dict) -> tuple[str, str]:
+    """Returns (system, user) prompt text; the rubric is part of the per-task-type system prefix."""
+    # None = no rubric at all, () = rubric without criteria (still prints the header)
+    criteria = tuple(str(c) for c in rubric.get("criteria", [])) if rubric else None
+    user = _CRITIC_USER_TEMPLATE.format(
+        text=original_input,
+        label=labeler_output.get("label", ""),
+        reasoning=labeler_output.get("reasoning", ""),
+    )
+    return _critic_system(task_type, criteria), user
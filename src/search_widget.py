@@ -1,9 +1,18 @@
 """Reusable Streamlit search + select widget for academic papers."""
 import io
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 import streamlit as st
 from src.paper_search import search_papers
 
+# PDF downloads run in parallel; size the connection pool to match
+_PDF_WORKERS = 8
+_PDF_SESSION = requests.Session()
+_PDF_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+_PDF_SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+_PDF_MAX_BYTES = 64 << 20
+
 
 def render_search_widget(key: str, min_select: int = 1) -> list[dict]:
     """
@@ -70,6 +79,22 @@ def render_search_widget(key: str, min_select: int = 1) -> list[dict]:
     return st.session_state.get(confirmed_key, [])
 
 
+def _download_pdf(url: str) -> io.BytesIO | None:
+    """Stream a PDF into memory in 64KB chunks; None on any failure or if it exceeds _PDF_MAX_BYTES."""
+    try:
+        with _PDF_SESSION.get(url, stream=True, timeout=15) as resp:
+            resp.raise_for_status()
+            buf = io.BytesIO()
+            for chunk in resp.iter_content(chunk_size=65536):
+                buf.write(chunk)
+                if buf.tell() > _PDF_MAX_BYTES:
+                    return None
+    except Exception:
+        return None
+    buf.seek(0)
+    return buf
+
+
 def search_results_to_papers(selected: list[dict]) -> list[dict]:
     """
     Convert selected search result dicts to the same format as ingest_paper().
@@ -77,17 +102,21 @@ def search_results_to_papers(selected: list[dict]) -> list[dict]:
     """
     from src.paper_ingestion import ingest_paper
 
+    # Fetch all PDFs concurrently; parsing stays on this thread (PyMuPDF is not thread-safe)
+    urls = [item.get("pdf_url") for item in selected]
+    pending = [i for i, url in enumerate(urls) if url]
+    downloads = [None] * len(selected)
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(_PDF_WORKERS, len(pending))) as ex:
+            for i, buf in zip(pending, ex.map(_download_pdf, [urls[i] for i in pending])):
+                downloads[i] = buf
+
     papers = []
-    for item in selected:
-        pdf_url = item.get("pdf_url")
-        if pdf_url:
+    for item, pdf_url, buf in zip(selected, urls, downloads):
+        if buf is not None:
             try:
-                resp = requests.get(pdf_url, timeout=15)
-                resp.raise_for_status()
-                buf = io.BytesIO(resp.content)
                 buf.name = f"{item['title'][:50]}.pdf"
-                paper = ingest_paper(buf)
-                papers.append(paper)
+                papers.append(ingest_paper(buf))
                 continue
             except Exception:
                 pass  # Fall through to abstract fallback
@@ -1,7 +1,11 @@
 """BaseTool ABC and ToolResult dataclass."""
 import time
+import weakref
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Optional
+import numpy as np
 import pandas as pd
 
 
@@ -15,20 +19,151 @@ class ToolResult:
     elapsed_seconds: float = 0.0
 
 
+class ColumnIndex:
+    """
+    Per-frame schema facts shared by every validator in a pipeline run;
+    each is computed on first access, once per frame.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        # Weak, so the index never keeps an already-consumed frame alive
+        self._frame = weakref.ref(frame)
+        self.nrows = len(frame)
+
+    def describes(self, frame: pd.DataFrame) -> bool:
+        return self._frame() is frame
+
+    @cached_property
+    def columns(self) -> frozenset:
+        return frozenset(self._frame().columns)
+
+    @cached_property
+    def dtypes(self) -> dict:
+        return self._frame().dtypes.to_dict()
+
+    @cached_property
+    def any_null(self) -> dict:
+        return self._frame().isna().any().to_dict()
+
+
+def _column_arrays(frame: pd.DataFrame) -> list:
+    """One array per column, read straight off the block manager when pandas exposes it."""
+    try:
+        arrays = frame._mgr.column_arrays
+    except AttributeError:  # private API; per-column extraction otherwise
+        return [frame.iloc[:, k].to_numpy() for k in range(frame.shape[1])]
+    out = []
+    for arr in arrays:
+        if isinstance(arr, np.ndarray):
+            # Views into the frame's blocks: read-only so tools can't bypass Copy-on-Write
+            arr = arr.view()
+            arr.flags.writeable = False
+        else:
+            arr = np.asarray(arr)  # extension arrays, as Series.to_numpy() would give
+        out.append(arr)
+    return out
+
+
+class PipelineFrame:
+    """
+    Struct-of-arrays view of a frame for array-level tools: `cols` maps each
+    column to a read-only NumPy array, extracted in one pass on first access
+    and shared by every tool that reads the same frame. `mask`, if set, is a
+    boolean row filter applied when a frame is rebuilt.
+    """
+    __slots__ = ("_frame", "index", "mask", "_cols")
+
+    def __init__(self, frame: pd.DataFrame, mask: np.ndarray = None):
+        # Weak, like ColumnIndex: Pipeline caches views across tools
+        self._frame = weakref.ref(frame)
+        self.index = frame.index
+        self.mask = mask
+        self._cols = None
+
+    def describes(self, frame: pd.DataFrame) -> bool:
+        return self._frame() is frame
+
+    @property
+    def cols(self) -> dict:
+        if self._cols is None:
+            frame = self._frame()
+            self._cols = dict(zip(frame.columns, _column_arrays(frame)))
+        return self._cols
+
+    def to_frame(self) -> pd.DataFrame:
+        frame = self._frame()
+        return frame if self.mask is None else frame[self.mask]
+
+    def with_columns(self, arrays: dict) -> pd.DataFrame:
+        """New frame with `arrays` added or replaced; untouched columns are shared, not copied."""
+        frame = self._frame().assign(**{c: pd.Series(a, index=self.index, copy=False) for c, a in arrays.items()})
+        return frame if self.mask is None else frame[self.mask]
+
+
 class BaseTool(ABC):
     name: str = "base"
     description: str = ""
+    # Columns the tool reads / writes; None means the whole frame (including
+    # its rows). Pipeline runs tools with disjoint column sets concurrently.
+    reads: Optional[frozenset] = None
+    writes: Optional[frozenset] = None
+    # Bump when a change to run() alters its output, so cached results are not reused
+    version: str = "1"
+    # Tools that set this implement run_arrow; Pipeline then streams Arrow
+    # record batches through consecutive such tools without pandas round-trips
+    supports_arrow: bool = False
+    # Tools that set this implement run_frame and read column arrays from a
+    # PipelineFrame that Pipeline shares between tools reading the same frame
+    supports_frame: bool = False
+    # Set on tools that modify the frame passed to run() in place; Pipeline
+    # hands them a copy so the caller's frame and earlier results stay intact
+    mutates_input: bool = False
+    # "map": element-wise, keeps rows and index; "shape": works on any chunk
+    # of rows independently but may add/drop rows or columns; "reduce": needs
+    # the whole dataset (the default). Map tools with an `expr`
+    # ("column = expression") are fused into one pass by Pipeline.
+    kind: str = "reduce"
+    expr: Optional[str] = None
 
     @abstractmethod
     def run(self, data: pd.DataFrame, config=None, progress_callback=None) -> ToolResult:
         ...
 
     @abstractmethod
-    def validate_input(self, data: pd.DataFrame) -> tuple[bool, list]:
+    def validate_input(self, data: pd.DataFrame, column_index: ColumnIndex = None) -> tuple[bool, list]:
+        """`column_index`, when given, describes `data` and may be used instead of re-inspecting it."""
         ...
 
+    def input_schema_requirements(self) -> Optional[dict]:
+        """
+        {column: dtype string or None} when validate_input checks nothing but
+        these columns (and dtypes), letting Pipeline skip re-validation on an
+        unchanged schema. None (the default) means always validate.
+        """
+        return None
+
+    def run_frame(self, frame: "PipelineFrame", config=None, progress_callback=None) -> ToolResult:
+        """run() over a PipelineFrame view."""
+        raise NotImplementedError(f"{self.name} does not support PipelineFrame input")
+
+    def run_arrow(self, batch, config=None):
+        """Transform one pyarrow.RecordBatch and return the resulting batch."""
+        raise NotImplementedError(f"{self.name} does not support Arrow batches")
+
+    def cache_key(self) -> tuple:
+        """Identity of this tool's behaviour: class, version and constructor parameters."""
+        params = sorted((k, _stable_repr(v)) for k, v in vars(self).items())
+        return (type(self).__qualname__, self.version, tuple(params))
+
     def _timed_run(self, data: pd.DataFrame, config=None, progress_callback=None) -> ToolResult:
         start = time.time()
         result = self.run(data, config=config, progress_callback=progress_callback)
         result.elapsed_seconds = time.time() - start
         return result
+
+
+def _stable_repr(value) -> str:
+    # Set iteration order varies between processes; sort so keys are reproducible
+    if isinstance(value, (set, frozenset)):
+        return repr(sorted(map(repr, value)))
+    return repr(value)
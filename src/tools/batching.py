@@ -0,0 +1,88 @@
+"""Latency-driven batch sizing for streamed tool execution."""
+import time
+from typing import Iterator
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: only Pipeline.run_iter rebatches, and it requires pyarrow
+    pa = None
+
+
+class AdaptiveBatcher:
+    """
+    Picks the next batch size for one tool from its measured cost per row.
+    Keeps an EMA of seconds/row: the size doubles while the EMA keeps
+    falling (fixed per-call overhead is still being amortized) and halves
+    when a batch's cost per row spikes above `spike` x the EMA.
+    """
+
+    def __init__(self, min_size: int = 16, max_size: int = 8192, alpha: float = 0.3,
+                 spike: float = 2.0, max_delay: float = None):
+        self.min_size = max(1, min_size)
+        self.max_size = max(self.min_size, max_size)
+        self.alpha = alpha
+        self.spike = spike
+        # Flush a partial batch once its first rows have waited this many seconds
+        self.max_delay = max_delay
+        self.size = self.min_size
+        self.ema = None
+        self.rows = 0
+        self.seconds = 0.0
+        self.batches = 0
+
+    @property
+    def throughput(self) -> float:
+        """Observed rows per second over every recorded batch."""
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def record(self, rows: int, seconds: float):
+        """Account one processed batch and adjust `size` for the next."""
+        if rows <= 0:
+            return
+        self.rows += rows
+        self.seconds += seconds
+        self.batches += 1
+        per_row = seconds / rows
+        if self.ema is None:
+            self.ema = per_row
+            self.size = min(self.size * 2, self.max_size)
+            return
+        previous = self.ema
+        self.ema = self.alpha * per_row + (1 - self.alpha) * previous
+        if per_row > self.spike * previous:
+            self.size = max(self.size // 2, self.min_size)
+        elif self.ema < previous:
+            self.size = min(self.size * 2, self.max_size)
+
+    def rebatch(self, batches: Iterator) -> Iterator:
+        """
+        Re-cut a stream of record batches to the current `size`. The size is
+        read again after every yield, so record() calls made between pulls
+        shape the next batch.
+        """
+        pending, rows, first, empty, yielded = [], 0, None, None, False
+        for batch in batches:
+            if batch.num_rows == 0:
+                empty = batch
+                continue
+            offset = 0
+            while offset < batch.num_rows:
+                take = min(self.size - rows, batch.num_rows - offset)
+                pending.append(batch.slice(offset, take))
+                rows += take
+                offset += take
+                if first is None:
+                    first = time.time()
+                if rows >= self.size or (self.max_delay is not None and time.time() - first >= self.max_delay):
+                    yield _combine(pending)
+                    pending, rows, first, yielded = [], 0, None, True
+        if pending:
+            yield _combine(pending)
+        elif empty is not None and not yielded:
+            yield empty  # keep the schema flowing for an all-empty stream
+
+
+def _combine(batches: list):
+    if len(batches) == 1:
+        return batches[0]
+    return pa.Table.from_batches(batches).combine_chunks().to_batches()[0]
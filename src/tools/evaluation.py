@@ -1,7 +1,7 @@
 """EvaluationTool: classification metrics from scratch."""
 import time
+import numpy as np
 import pandas as pd
-from collections import defaultdict
 from src.tools.base import BaseTool, ToolResult
 
 
@@ -12,12 +12,19 @@ class EvaluationTool(BaseTool):
     def __init__(self, pred_col: str = "label", gt_col: str = "ground_truth"):
         self.pred_col = pred_col
         self.gt_col = gt_col
+        # Metrics only: the frame is passed through unchanged
+        self.reads = frozenset({pred_col, gt_col, "confidence", "final_confidence"})
+        self.writes = frozenset()
 
-    def validate_input(self, data: pd.DataFrame) -> tuple[bool, list]:
+    def input_schema_requirements(self) -> dict:
+        return {self.pred_col: None, self.gt_col: None}
+
+    def validate_input(self, data: pd.DataFrame, column_index=None) -> tuple[bool, list]:
         errors = []
-        if self.pred_col not in data.columns:
+        columns = column_index.columns if column_index is not None else data.columns
+        if self.pred_col not in columns:
             errors.append(f"Missing prediction column: {self.pred_col}")
-        if self.gt_col not in data.columns:
+        if self.gt_col not in columns:
             errors.append(f"Missing ground truth column: {self.gt_col}")
         return len(errors) == 0, errors
 
@@ -28,32 +35,38 @@ class EvaluationTool(BaseTool):
             return ToolResult(success=False, data=data, metadata={}, errors=errors,
                               tool_name=self.name, elapsed_seconds=0)
 
-        preds = data[self.pred_col].astype(str).tolist()
-        gts = data[self.gt_col].astype(str).tolist()
-        classes = sorted(set(preds + gts))
-
-        # Per-class metrics
-        tp = defaultdict(int)
-        fp = defaultdict(int)
-        fn = defaultdict(int)
-
-        for p, g in zip(preds, gts):
-            if p == g:
-                tp[g] += 1
-            else:
-                fp[p] += 1
-                fn[g] += 1
-
-        per_class = {}
-        for cls in classes:
-            prec = tp[cls] / max(tp[cls] + fp[cls], 1)
-            rec = tp[cls] / max(tp[cls] + fn[cls], 1)
-            f1 = 2 * prec * rec / max(prec + rec, 1e-9)
-            per_class[cls] = {"precision": round(prec, 4), "recall": round(rec, 4), "f1": round(f1, 4)}
+        preds = data[self.pred_col].astype(str).to_numpy()
+        gts = data[self.gt_col].astype(str).to_numpy()
+        total = len(preds)
+
+        # Integer-encode both columns against the sorted union of labels
+        # (hash-based factorize, then sort only the few distinct labels)
+        codes, uniques = pd.factorize(np.concatenate([preds, gts]))
+        order = np.argsort(uniques)
+        classes = uniques[order]
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        codes = rank[codes]
+        codes_p, codes_g = codes[:total], codes[total:]
+        k = len(classes)
+
+        # Confusion matrix: rows = ground truth, columns = prediction
+        cm = np.bincount(codes_g * k + codes_p, minlength=k * k).reshape(k, k)
+        tp = cm.diagonal()
+        fp = cm.sum(axis=0) - tp
+        fn = cm.sum(axis=1) - tp
+
+        prec = tp / np.maximum(tp + fp, 1)
+        rec = tp / np.maximum(tp + fn, 1)
+        f1 = 2 * prec * rec / np.maximum(prec + rec, 1e-9)
+        per_class = {
+            str(cls): {"precision": round(float(p), 4), "recall": round(float(r), 4), "f1": round(float(f), 4)}
+            for cls, p, r, f in zip(classes, prec, rec, f1)
+        }
 
         # Aggregate
-        total = len(preds)
-        accuracy = sum(1 for p, g in zip(preds, gts) if p == g) / max(total, 1)
+        correct = codes_p == codes_g
+        accuracy = int(tp.sum()) / max(total, 1)
         macro_f1 = sum(v["f1"] for v in per_class.values()) / max(len(per_class), 1)
 
         # ECE (if confidence column exists)
@@ -61,8 +74,7 @@ class EvaluationTool(BaseTool):
         if "confidence" in data.columns or "final_confidence" in data.columns:
             conf_col = "final_confidence" if "final_confidence" in data.columns else "confidence"
             confs = data[conf_col].fillna(50).astype(float) / 100.0
-            correct = [1 if p == g else 0 for p, g in zip(preds, gts)]
-            ece = _compute_ece(confs.tolist(), correct)
+            ece = _compute_ece(confs.to_numpy(), correct)
 
         metadata = {
             "accuracy": round(accuracy, 4),
@@ -82,18 +94,16 @@ class EvaluationTool(BaseTool):
         )
 
 
-def _compute_ece(confidences: list, correct: list, n_bins: int = 10) -> float:
-    bins = [[] for _ in range(n_bins)]
-    for conf, corr in zip(confidences, correct):
-        idx = min(int(conf * n_bins), n_bins - 1)
-        bins[idx].append((conf, corr))
-
-    ece = 0.0
-    n = len(confidences)
-    for bin_items in bins:
-        if not bin_items:
-            continue
-        avg_conf = sum(c for c, _ in bin_items) / len(bin_items)
-        avg_acc = sum(corr for _, corr in bin_items) / len(bin_items)
-        ece += abs(avg_conf - avg_acc) * len(bin_items) / max(n, 1)
-    return ece
+def _compute_ece(confidences, correct, n_bins: int = 10) -> float:
+    confs = np.asarray(confidences, dtype=np.float64)
+    corr = np.asarray(correct, dtype=np.float64)
+    idx = np.clip((confs * n_bins).astype(np.int64), 0, n_bins - 1)
+
+    # Per-bin count, confidence sum and accuracy sum in three bincount passes
+    counts = np.bincount(idx, minlength=n_bins)
+    sum_conf = np.bincount(idx, weights=confs, minlength=n_bins)
+    sum_corr = np.bincount(idx, weights=corr, minlength=n_bins)
+
+    nz = counts > 0
+    gaps = np.abs(sum_conf[nz] - sum_corr[nz])  # = |avg_conf - avg_acc| * bin size
+    return float(gaps.sum() / max(len(confs), 1))
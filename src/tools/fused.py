@@ -0,0 +1,279 @@
+"""Element-wise expression tools and fusion of consecutive ones into a single pass."""
+import ast
+import copy
+import hashlib
+import importlib.util
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from src.tools.base import BaseTool, PipelineFrame, ToolResult
+
+try:
+    import numba
+except ImportError:  # optional: fused tools evaluate with NumPy instead
+    numba = None
+
+# Functions usable in expressions; the NumPy names also work on scalars inside numba
+_FUNCS = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "log": np.log,
+    "exp": np.exp,
+    "minimum": np.minimum,
+    "maximum": np.maximum,
+}
+_BIN_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPS = (ast.UAdd, ast.USub)
+
+# Below this many rows a compiled loop doesn't pay back its compile time
+_NUMBA_MIN_ROWS = 100_000
+# fastmath without nnan/ninf: those let LLVM drop NaN/inf handling, so results
+# would differ from the NumPy engine on the same rows
+_FASTMATH = {"contract", "reassoc"}
+_kernels: dict = {}
+# Generated kernels are written here as modules so numba can cache their machine code on disk;
+# a per-user cache dir, never the installed package
+_KERNEL_DIR = os.path.join(
+    os.environ.get("NUMBA_CACHE_DIR")
+    or os.environ.get("XDG_CACHE_HOME")
+    or os.path.join(os.path.expanduser("~"), ".cache"),
+    "papertrail", "kernels",
+)
+_KERNEL_HEADER = "import numpy as np\nfrom numba import prange\n\n\n"
+
+
+def parse_expr(expr: str) -> tuple[str, ast.expr, list[str]]:
+    """
+    Parse `"target = expression"` over column names. Returns (target, expression
+    node, columns read). Only arithmetic, numeric constants and _FUNCS calls are allowed.
+    """
+    try:
+        tree = ast.parse(expr, mode="exec")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression {expr!r}: {e.msg}") from None
+    if (len(tree.body) != 1 or not isinstance(tree.body[0], ast.Assign)
+            or len(tree.body[0].targets) != 1 or not isinstance(tree.body[0].targets[0], ast.Name)):
+        raise ValueError(f"Expression must be a single `column = ...` assignment: {expr!r}")
+
+    stmt = tree.body[0]
+    columns = []
+    for node in ast.walk(stmt.value):
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCS or node.keywords:
+                raise ValueError(f"Unsupported call in {expr!r}")
+        elif isinstance(node, ast.Name):
+            if node.id not in _FUNCS and node.id not in columns:
+                columns.append(node.id)
+        elif isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+                raise ValueError(f"Only numeric constants are allowed in {expr!r}")
+        elif isinstance(node, ast.BinOp):
+            if not isinstance(node.op, _BIN_OPS):
+                raise ValueError(f"Unsupported operator in {expr!r}")
+        elif isinstance(node, ast.UnaryOp):
+            if not isinstance(node.op, _UNARY_OPS):
+                raise ValueError(f"Unsupported operator in {expr!r}")
+        elif not isinstance(node, (ast.Load, ast.operator, ast.unaryop)):
+            raise ValueError(f"Unsupported syntax in {expr!r}")
+    return stmt.targets[0].id, stmt.value, columns
+
+
+class _Prefix(ast.NodeTransformer):
+    # Column names become c_<name> locals so they can't shadow np/prange/loop variables
+    def visit_Name(self, node):
+        if node.id in _FUNCS:
+            return ast.copy_location(ast.Attribute(value=ast.Name("np", ast.Load()), attr=_FUNCS[node.id].__name__,
+                                                   ctx=ast.Load()), node)
+        return ast.copy_location(ast.Name(f"c_{node.id}", node.ctx), node)
+
+
+def _local(node: ast.expr) -> str:
+    return ast.unparse(_Prefix().visit(copy.deepcopy(node)))
+
+
+def _evaluate_numpy(steps, arrays: dict, n: int) -> dict:
+    """Apply each (target, node) in order over whole-column arrays; returns the written columns."""
+    env = dict(arrays)
+    out = {}
+    for target, node, _ in steps:
+        code = compile(ast.fix_missing_locations(ast.Expression(body=node)), "<expr>", "eval")
+        value = eval(code, {"__builtins__": {}, **_FUNCS}, env)
+        if np.ndim(value) == 0:  # constant expression
+            value = np.full(n, value)
+        env[target] = out[target] = value
+    return out
+
+
+def _kernel_source(steps, inputs: list[str], outputs: list[str]) -> str:
+    """Source of one row loop computing every step and storing each output column."""
+    args = ", ".join(["n"] + [f"in_{k}" for k in range(len(inputs))] + [f"out_{k}" for k in range(len(outputs))])
+    lines = [f"def _fused({args}):", "    for i in prange(n):"]
+    lines += [f"        c_{col} = in_{k}[i]" for k, col in enumerate(inputs)]
+    for target, node, _ in steps:
+        lines.append(f"        c_{target} = {_local(node)}")
+    lines += [f"        out_{k}[i] = c_{col}" for k, col in enumerate(outputs)]
+    return "\n".join(lines) + "\n"
+
+
+def _load_kernel(source: str):
+    """Import `source` from a file under _KERNEL_DIR; None if it can't be written there."""
+    # Flags are part of the name: numba's on-disk index doesn't key on them
+    key = f"{sorted(_FASTMATH)}\n{source}"
+    name = "_papertrail_fused_" + hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+    path = os.path.join(_KERNEL_DIR, name + ".py")
+    try:
+        if not os.path.exists(path):
+            os.makedirs(_KERNEL_DIR, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(_KERNEL_HEADER + source)
+            os.replace(tmp, path)
+    except OSError:
+        return None
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Numba re-imports the module by name when it loads cached parallel code;
+    # the prefixed name can't shadow a real module
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module._fused
+
+
+def _compiled(source: str):
+    """
+    njit-compiled kernel for `source`, one per process. File-backed kernels
+    also hit numba's on-disk cache, so a new process (or a Pipeline worker)
+    loads the machine code for a chain/dtype signature it has seen before
+    instead of compiling it again.
+    """
+    fn = _kernels.get(source)
+    if fn is None:
+        py_fn = _load_kernel(source)
+        if py_fn is not None:
+            fn = numba.njit(parallel=True, fastmath=_FASTMATH, cache=True)(py_fn)
+        else:
+            namespace = {"np": np, "prange": numba.prange}
+            exec(source, namespace)
+            fn = numba.njit(parallel=True, fastmath=_FASTMATH)(namespace["_fused"])
+        _kernels[source] = fn
+    return fn
+
+
+class ExprTool(BaseTool):
+    """Adds or replaces one column with an element-wise expression, e.g. `"z = (x - 3) / 2"`."""
+    name = "ExprTool"
+    description = "Computes a column from an element-wise arithmetic expression."
+    kind = "map"
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        target, _, columns = parse_expr(expr)
+        self.reads = frozenset(columns)
+        self.writes = frozenset({target})
+
+    def input_schema_requirements(self) -> dict:
+        return dict.fromkeys(self.reads)
+
+    def validate_input(self, data: pd.DataFrame, column_index=None) -> tuple[bool, list]:
+        columns = column_index.columns if column_index is not None else data.columns
+        missing = [c for c in sorted(self.reads) if c not in columns]
+        return not missing, [f"Missing column: {c}" for c in missing]
+
+    def run(self, data: pd.DataFrame, config=None, progress_callback=None) -> ToolResult:
+        result = FusedMapTool([self]).run(data, config=config, progress_callback=progress_callback)
+        result.tool_name = self.name
+        return result
+
+
+class FusedMapTool(BaseTool):
+    """
+    Runs consecutive map tools as one tool: input columns are extracted once
+    and every expression is applied in a single row loop (numba) or in one
+    sequence of whole-array NumPy operations, with no intermediate frames.
+    """
+    name = "FusedMapTool"
+    description = "Element-wise tools fused into one pass."
+    kind = "map"
+    supports_frame = True
+
+    def __init__(self, tools: list[BaseTool]):
+        self.tools = tools
+        self.steps = [parse_expr(t.expr) for t in tools]
+        produced, inputs, outputs = set(), [], []
+        for target, _, columns in self.steps:
+            inputs += [c for c in columns if c not in produced and c not in inputs]
+            produced.add(target)
+            if target not in outputs:
+                outputs.append(target)
+        self.inputs = inputs
+        self.outputs = outputs
+        self.reads = frozenset(inputs)
+        self.writes = frozenset(outputs)
+        self.name = f"FusedMapTool[{', '.join(t.name for t in tools)}]"
+
+    def cache_key(self) -> tuple:
+        return (type(self).__qualname__, self.version, tuple(t.cache_key() for t in self.tools))
+
+    def input_schema_requirements(self) -> dict:
+        return dict.fromkeys(self.inputs)
+
+    def validate_input(self, data: pd.DataFrame, column_index=None) -> tuple[bool, list]:
+        columns = column_index.columns if column_index is not None else data.columns
+        missing = [c for c in self.inputs if c not in columns]
+        return not missing, [f"Missing column: {c}" for c in missing]
+
+    def run(self, data: pd.DataFrame, config=None, progress_callback=None) -> ToolResult:
+        return self.run_frame(PipelineFrame(data), config=config, progress_callback=progress_callback)
+
+    def run_frame(self, frame: PipelineFrame, config=None, progress_callback=None) -> ToolResult:
+        start = time.time()
+        cols = frame.cols
+        arrays = {c: cols[c] for c in self.inputs}
+        n = len(frame.index)
+        numeric = all(a.dtype.kind in "biuf" for a in arrays.values())
+
+        values = None
+        engine = "numpy"
+        if numba is not None and numeric and n >= _NUMBA_MIN_ROWS:
+            # Output dtypes from a one-row NumPy evaluation, then one compiled pass
+            probe = _evaluate_numpy(self.steps, {c: a[:1] for c, a in arrays.items()}, 1)
+            outs = [np.empty(n, dtype=probe[c].dtype) for c in self.outputs]
+            try:
+                kernel = _compiled(_kernel_source(self.steps, self.inputs, self.outputs))
+                kernel(n, *[arrays[c] for c in self.inputs], *outs)
+                values = dict(zip(self.outputs, outs))
+                engine = "numba"
+            except Exception:  # typing failure, e.g. a column rebound to another dtype
+                values = None
+        if values is None:
+            values = _evaluate_numpy(self.steps, arrays, n)
+
+        if progress_callback:
+            progress_callback(1.0, "Done!")
+        return ToolResult(
+            success=True,
+            data=frame.with_columns({c: values[c] for c in self.outputs}),
+            metadata={"fused_tools": len(self.tools), "engine": engine},
+            errors=[],
+            tool_name=self.name,
+            elapsed_seconds=time.time() - start,
+        )
+
+
+def fuse_map_tools(tools: list[BaseTool]) -> list[BaseTool]:
+    """Replace each run of two or more adjacent map tools that carry an `expr` with one FusedMapTool."""
+    fused, run = [], []
+    for tool in tools + [None]:
+        if tool is not None and tool.kind == "map" and tool.expr is not None:
+            run.append(tool)
+            continue
+        if len(run) > 1:
+            fused.append(FusedMapTool(run))
+        else:
+            fused.extend(run)
+        run = []
+        if tool is not None:
+            fused.append(tool)
+    return fused
@@ -1,69 +1,76 @@
 """LabelingTool: wraps the LangGraph pipeline."""
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 from src.tools.base import BaseTool, ToolResult
-from src.models import LabelingTask
 from src.ingestion import get_text_column
 
 
 class LabelingTool(BaseTool):
     name = "LabelingTool"
     description = "Labels dataset rows using the LangGraph labeler-critic-validator pipeline."
+    kind = "shape"  # rows are labeled independently
 
     def __init__(self, task_type: str = "sentiment", modality: str = "TEXT"):
         self.task_type = task_type
         self.modality = modality
 
-    def validate_input(self, data: pd.DataFrame) -> tuple[bool, list]:
-        if data is None or len(data) == 0:
+    def validate_input(self, data: pd.DataFrame, column_index=None) -> tuple[bool, list]:
+        if data is None or (column_index.nrows if column_index is not None else len(data)) == 0:
             return False, ["DataFrame is empty"]
         return True, []
 
     def run(self, data: pd.DataFrame, config=None, progress_callback=None) -> ToolResult:
-        from src.graph import run_labeling_graph
+        from src.graph import build_labeling_pipeline
         from src.config import get_config
 
         if config is None:
             config = get_config()
 
         start = time.time()
-        df = data.copy()
-        text_col = get_text_column(df)
+        text_col = get_text_column(data)
 
-        results = []
-        total = len(df)
+        total = len(data)
         errors = []
 
-        for i, (idx, row) in enumerate(df.iterrows()):
-            text = str(row.get(text_col, ""))
-            task = LabelingTask(
-                data_id=str(idx),
-                modality=self.modality,
-                task_type=self.task_type,
-                text_content=text,
-            )
-
-            try:
-                result = run_labeling_graph(task, config)
-                results.append(result)
-            except Exception as e:
-                errors.append(f"Row {idx}: {str(e)}")
-                results.append({
-                    "data_id": str(idx),
-                    "label": "ERROR",
-                    "confidence": 0,
-                    "reasoning": str(e),
-                    "final_confidence": 0,
-                    "retry_count": 0,
-                })
-
-            if progress_callback:
-                progress_callback((i + 1) / total, f"Labeled {i+1}/{total} items...")
+        # Pull the two columns we need as arrays once instead of boxing every row
+        texts = data[text_col].astype(str).to_numpy()
+        ids = data.index.astype(str).to_numpy()
+        # Every row shares task_type/modality: resolve graph, config and state template once
+        pipeline = build_labeling_pipeline(self.task_type, self.modality, config)
+
+        # Rows are independent LLM round-trips: keep several in flight and
+        # slot each result back at its row position as it completes
+        results = [None] * total
+        done = 0
+        with ThreadPoolExecutor(max_workers=max(1, config.labeling_parallelism)) as ex:
+            futures = {ex.submit(pipeline, ids[i], texts[i]): i for i in range(total)}
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    results[i] = fut.result()
+                except Exception as e:
+                    data_id = ids[i]
+                    errors.append(f"Row {data_id}: {str(e)}")
+                    results[i] = {
+                        "data_id": data_id,
+                        "label": "ERROR",
+                        "confidence": 0,
+                        "reasoning": str(e),
+                        "final_confidence": 0,
+                        "retry_count": 0,
+                    }
+
+                # Called from this thread only, so Streamlit widgets can be updated safely
+                done += 1
+                if progress_callback:
+                    progress_callback(done / total, f"Labeled {done}/{total} items...")
 
         # Merge results back
         results_df = pd.DataFrame(results)
         results_df["data_id"] = results_df["data_id"].astype(str)
-        df = df.reset_index(drop=True)
+        # New frame for the output; the input is never modified, so no up-front copy
+        df = data.reset_index(drop=True)
         df.index = df.index.astype(str)
 
         for col in ["label", "confidence", "reasoning", "final_confidence", "retry_count"]:
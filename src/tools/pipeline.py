@@ -1,41 +1,672 @@
-"""Sequential tool chaining."""
+"""Tool chaining, with independent tools run concurrently."""
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Iterable, Iterator
 import pandas as pd
-from src.tools.base import BaseTool, ToolResult
+from src.tools.base import BaseTool, ColumnIndex, PipelineFrame, ToolResult
+from src.tools.batching import AdaptiveBatcher
+from src.tools.fused import fuse_map_tools
+from src.tools.transport import put_frame, run_remote, unlink_frame, unpack_result
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: Arrow-capable tools fall back to their pandas run(); no on-disk run cache
+    pa = None
+
+# Tools return new frames rather than mutating their input. The pipeline doesn't
+# change pandas options; where a tool writes in place it gets a shallow copy under
+# Copy-on-Write (always on in pandas >= 3, opt-in before) and a deep copy otherwise.
+_PANDAS_3 = int(pd.__version__.split(".")[0]) >= 3
+
+
+def _copy_on_write() -> bool:
+    return _PANDAS_3 or pd.get_option("mode.copy_on_write") is True
+
+
+def _overlaps(a, b) -> bool:
+    """Column-set intersection where None stands for every column."""
+    if a is None:
+        return b is None or bool(b)
+    if b is None:
+        return bool(a)
+    return bool(a & b)
+
+
+# Rows of the first batch converted to pandas for an Arrow tool's validate_input
+_PROBE_ROWS = 64
+
+def _content_hash(df: pd.DataFrame):
+    """
+    Identity of the whole frame (every row, index included) for the result
+    caches. None when cells can't be hashed.
+    """
+    try:
+        rows = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    except TypeError:  # unhashable cells, e.g. lists
+        return None
+    digest = hashlib.blake2b(rows.tobytes(), digest_size=20).hexdigest()
+    return (df.shape, tuple(df.columns), tuple(str(d) for d in df.dtypes), digest)
+
+
+def _build_stages(tools: list[BaseTool]) -> list[list[int]]:
+    """
+    Group tool indices into stages that can run concurrently. Tool j depends
+    on an earlier tool i when j reads what i writes, writes what i reads, or
+    both write the same columns; stages are the levels of Kahn's topological sort.
+    """
+    n = len(tools)
+    children = [[] for _ in range(n)]
+    indegree = [0] * n
+    for j in range(n):
+        rj, wj = tools[j].reads, tools[j].writes
+        for i in range(j):
+            ri, wi = tools[i].reads, tools[i].writes
+            if _overlaps(wi, rj) or _overlaps(ri, wj) or _overlaps(wi, wj):
+                children[i].append(j)
+                indegree[j] += 1
+
+    stages = []
+    ready = [i for i in range(n) if indegree[i] == 0]
+    placed = 0
+    while ready:
+        stages.append(ready)
+        placed += len(ready)
+        nxt = []
+        for i in ready:
+            for j in children[i]:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    nxt.append(j)
+        ready = sorted(nxt)
+    if placed != n:
+        raise ValueError("Tool dependencies contain a cycle")
+    return stages
+
+
+# Object/string columns with at most this share of distinct values become categoricals
+_CATEGORY_MAX_RATIO = 0.5
+# Leading rows checked first, so mostly-unique columns are skipped without hashing all of them
+_CARDINALITY_SAMPLE = 10_000
+
+
+def _apply_dtype_policy(frame: pd.DataFrame, policy) -> pd.DataFrame:
+    """
+    Cast the columns `policy` names (dict, or callable returning one) to its
+    dtypes; downcast every other numeric column (integers losslessly, floats
+    to float32) and turn low-cardinality object/string columns into categoricals.
+    """
+    explicit = (policy(frame) if callable(policy) else policy) or {}
+    out = frame.astype(explicit) if explicit else frame.copy(deep=False)
+    n = len(out)
+    for loc, (col, dtype) in enumerate(out.dtypes.items()):
+        if col in explicit or pd.api.types.is_bool_dtype(dtype):
+            continue
+        if pd.api.types.is_integer_dtype(dtype):
+            converted = pd.to_numeric(out.iloc[:, loc], downcast="integer")
+        elif pd.api.types.is_float_dtype(dtype):
+            converted = pd.to_numeric(out.iloc[:, loc], downcast="float")
+        elif dtype == object or pd.api.types.is_string_dtype(dtype):
+            column = out.iloc[:, loc]
+            head = column.iloc[:_CARDINALITY_SAMPLE]
+            try:
+                if (n == 0 or head.nunique() > _CATEGORY_MAX_RATIO * len(head)
+                        or column.nunique() > _CATEGORY_MAX_RATIO * n):
+                    continue
+            except TypeError:  # unhashable values, e.g. lists
+                continue
+            converted = column.astype("category")
+        else:
+            continue
+        if converted.dtype != dtype:
+            out.isetitem(loc, converted)
+    return out
+
+
+def _merge_columns(frame: pd.DataFrame, updates: dict) -> pd.DataFrame:
+    """Replace existing columns in place of the old ones and append new ones with a single concat."""
+    existing = {c: v for c, v in updates.items() if c in frame.columns}
+    added = {c: v for c, v in updates.items() if c not in frame.columns}
+    if existing:
+        frame = frame.assign(**existing)
+    if added:
+        frame = pd.concat([frame, pd.DataFrame(added, index=frame.index)], axis=1)
+    return frame
+
+
+def _release_frames(results: list, start: int, end: int) -> int:
+    """Drop the frames held by results[start:end]; returns `end`. Results may be cached, so they're replaced, not edited."""
+    for k in range(start, end):
+        if results[k].data is not None:
+            results[k] = replace(results[k], data=None)
+    return end
+
+
+class _ProgressAdapter:
+    """Maps a tool's 0-1 progress onto the pipeline's; one instance is retargeted per tool."""
+    __slots__ = ("cb", "i", "total", "name")
+
+    def __init__(self, cb, total: int):
+        self.cb = cb
+        self.i = 0
+        self.total = total
+        self.name = ""
+
+    def __call__(self, p, msg):
+        self.cb((self.i + p) / self.total, f"[{self.name}] {msg}")
 
 
 class Pipeline:
-    """Chains tools sequentially — each tool's output feeds into the next."""
+    """
+    Chains tools so each tool sees the output of the tools it depends on.
+    Tools whose declared reads/writes don't conflict share a stage and run on
+    worker threads; tools that don't declare them run one at a time, in order.
+    """
 
-    def __init__(self, tools: list[BaseTool]):
+    def __init__(self, tools: list[BaseTool], copy: bool = False, cache_size: int = 0,
+                 batch_size: int = 65536, cache_dir: str = None, keep_intermediate: bool = False,
+                 adaptive_batching: bool = True, processes: int = 0, dtype_policy=None):
         self.tools = tools
+        # When False only the last result keeps a frame (the pipeline output);
+        # earlier results drop theirs as soon as the next stage has consumed them
+        self.keep_intermediate = keep_intermediate
+        # Whole-run results persisted as <signature>.parquet + .json; needs pyarrow.
+        # Keyed on a hash of the full input. Skipped when keep_intermediate is set
+        # (only the final frame is stored) or dtype_policy is a callable (no stable key)
+        self.cache_dir = cache_dir
+        # Max rows per record batch for runs of Arrow-capable tools
+        self.batch_size = batch_size
+        # run_iter(): re-cut the stream per tool with an AdaptiveBatcher instead of
+        # passing the caller's batches through as they come
+        self.adaptive_batching = adaptive_batching
+        self.batchers = {}
+        # Deep-copy the input before the first tool runs (after its validation); off by default
+        self.copy = copy
+        # Execution plan: adjacent element-wise expression tools fused into one
+        self.plan = fuse_map_tools(tools)
+        self.stages = _build_stages(self.plan)
+        # Tools written before validate_input took a column_index keep working
+        self._takes_column_index = [
+            "column_index" in inspect.signature(t.validate_input).parameters for t in self.plan
+        ]
+        # LRU of successful ToolResults keyed on (tool, input content hash, config);
+        # opt-in, since hashing every row of each tool's input isn't free
+        self.cache_size = cache_size
+        # Worker processes for concurrent stages (0: threads). Tools and config
+        # must pickle; frames travel as Arrow IPC in shared memory. Needs pyarrow
+        self.processes = processes
+        # Dtypes applied to run()'s input before any tool sees it: a {column: dtype}
+        # dict or a callable(frame) returning one; columns it doesn't name are
+        # downcast too (floats lose precision). None leaves the input as is
+        self.dtype_policy = dtype_policy
+        # Input bytes the policy saved on the last run()
+        self.bytes_saved = 0
+        self._pool = None
+        self._view = None
+        self._hashed = None
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
 
-    def run(self, data: pd.DataFrame, config=None, progress_callback=None) -> list[ToolResult]:
-        results = []
-        current_data = data.copy()
+    def _cached_run(self, tool: BaseTool, data: pd.DataFrame, config, config_key, progress_callback=None,
+                    frame_view: PipelineFrame = None, handle: tuple = None) -> ToolResult:
+        def invoke():
+            if handle is not None:
+                return self._run_in_process(tool, handle, config)
+            if frame_view is not None and tool.supports_frame and frame_view.describes(data):
+                return tool.run_frame(frame_view, config=config, progress_callback=progress_callback)
+            return tool.run(data, config=config, progress_callback=progress_callback)
+
+        if self.cache_size <= 0:
+            return invoke()
+        fp = self._content_key(data)
+        if fp is None:
+            return invoke()
+
+        key = (tool.cache_key(), fp, config_key)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None:
+            if progress_callback:
+                progress_callback(1.0, "Reused cached result")
+            return replace(cached, metadata=dict(cached.metadata), errors=list(cached.errors))
+
+        result = invoke()
+        if result.success:
+            with self._cache_lock:
+                self._cache[key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    def _run_in_process(self, tool: BaseTool, handle: tuple, config) -> ToolResult:
+        # Only declared writes come back unless the caller keeps every tool's frame
+        columns = None if self.keep_intermediate or tool.writes is None else sorted(tool.writes)
+        future = self._pool.submit(run_remote, tool, handle, config, columns, not _copy_on_write())
+        return unpack_result(future.result())
 
-        for i, tool in enumerate(self.tools):
-            valid, errors = tool.validate_input(current_data)
+    def _share_stage_input(self, frame: pd.DataFrame):
+        """Shared-memory handle for a concurrent stage's input, or None to run the stage on threads."""
+        if self.processes <= 0 or pa is None:
+            return None
+        try:
+            handle = put_frame(frame)
+        except (pa.ArrowException, ValueError):
+            # Arrow can't hold it, or would hand tools other dtypes than the thread path
+            return None
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.processes)
+        return handle
+
+    def close(self):
+        """Shut down the worker processes, if any were started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _content_key(self, frame: pd.DataFrame):
+        """
+        _content_hash(frame), remembered for the last frame hashed so a stage's
+        tools share one hash. Forgotten at the start of each run(): the caller
+        may have edited the frame in place since.
+        """
+        last = self._hashed
+        if last is not None and last[0]() is frame:
+            return last[1]
+        key = _content_hash(frame)
+        self._hashed = (weakref.ref(frame), key)
+        return key
+
+    @staticmethod
+    def _schema_fingerprint(df: pd.DataFrame) -> tuple:
+        return tuple(df.columns), tuple(str(d) for d in df.dtypes)
+
+    @staticmethod
+    def _to_pandas(table) -> pd.DataFrame:
+        """
+        Arrow -> pandas without consolidating blocks or keeping both copies
+        alive: each column becomes its own block over the Arrow buffer, freed
+        from the table as it converts. Columns may come back read-only; tools
+        that write in place must set mutates_input so they get a CoW copy.
+        """
+        return table.to_pandas(split_blocks=True, self_destruct=True, zero_copy_only=False)
+
+    def _run_signature(self, data: pd.DataFrame, config_key: str):
+        """Hash of the tool chain, full input contents and config; None if the input can't be hashed."""
+        fp = self._content_key(data)
+        if fp is None:
+            return None
+        chain = repr([t.cache_key() for t in self.plan])
+        if self.dtype_policy is not None:
+            chain += f"|{self.dtype_policy!r}"
+        return hashlib.blake2b(f"{chain}|{fp!r}|{config_key}".encode(), digest_size=20).hexdigest()
+
+    def _load_run(self, sig: str):
+        base = os.path.join(self.cache_dir, sig)
+        try:
+            with open(base + ".json", "rb") as f:
+                entries = json.loads(f.read())
+            frame = self._to_pandas(pq.read_table(base + ".parquet", use_threads=True))
+        except (OSError, ValueError, pa.ArrowException):
+            return None
+        # Only the final frame is stored; intermediate results carry no data
+        results = [ToolResult(success=True, data=None, metadata=e["metadata"], errors=e["errors"],
+                              tool_name=e["tool_name"], elapsed_seconds=e["elapsed_seconds"]) for e in entries]
+        results[-1].data = frame
+        return results
+
+    def _save_run(self, sig: str, results: list[ToolResult], frame: pd.DataFrame):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        base = os.path.join(self.cache_dir, sig)
+        entries = [{"tool_name": r.tool_name, "metadata": r.metadata, "errors": r.errors,
+                    "elapsed_seconds": r.elapsed_seconds} for r in results]
+        try:
+            # Write-then-rename so a concurrent reader never sees a partial file
+            frame.to_parquet(base + ".parquet.tmp", engine="pyarrow", index=True)
+            with open(base + ".json.tmp", "w") as f:
+                json.dump(entries, f, default=str)
+        except Exception:
+            # e.g. mixed-type object columns Arrow can't infer: just don't cache
+            for path in (base + ".parquet.tmp", base + ".json.tmp"):
+                if os.path.exists(path):
+                    os.remove(path)
+            return
+        os.replace(base + ".parquet.tmp", base + ".parquet")
+        os.replace(base + ".json.tmp", base + ".json")
+
+    def _input_for(self, tool: BaseTool, frame: pd.DataFrame, data: pd.DataFrame) -> pd.DataFrame:
+        """The frame `tool` runs on; copies are made only once validation has passed."""
+        if self.copy and frame is data:
+            return frame.copy()
+        if tool.mutates_input:
+            # Under Copy-on-Write a shallow copy suffices: in-place writes copy the touched blocks
+            return frame.copy(deep=not _copy_on_write())
+        return frame
+
+    def _frame_view(self, tool: BaseTool, frame: pd.DataFrame):
+        """Shared PipelineFrame for `frame`, built once however many array-level tools read it."""
+        if not tool.supports_frame:
+            return None
+        view = self._view
+        if view is None or not view.describes(frame):
+            view = self._view = PipelineFrame(frame)
+        return view
+
+    def _arrow_stage(self, stage: list[int]) -> bool:
+        return pa is not None and len(stage) == 1 and self.plan[stage[0]].supports_arrow
+
+    def _run_arrow_chain(self, chain: list[int], data: pd.DataFrame, config, progress_callback, done: int):
+        """
+        Convert `data` to Arrow once and pass each record batch through every
+        tool in `chain` before converting back. Each tool validates against the
+        first rows of the batch as it would receive them. Returns
+        (output frame, results, failed result or None); only the last result
+        of the chain carries the frame.
+        """
+        # The index travels as ordinary columns, so filters keep the labels of the rows they keep
+        table = pa.Table.from_pandas(data, preserve_index=True)
+        index_cols = table.schema.pandas_metadata["index_columns"]
+        batches = table.to_batches(max_chunksize=self.batch_size) or [pa.RecordBatch.from_pylist([], schema=table.schema)]
+        del table
+        tools = [self.plan[i] for i in chain]
+        elapsed = [0.0] * len(tools)
+        failed = None
+
+        # First batch goes tool by tool so each tool can validate its actual input
+        batch = batches[0]
+        for k, tool in enumerate(tools):
+            valid, errors = tool.validate_input(batch.slice(0, _PROBE_ROWS).to_pandas())
             if not valid:
-                from src.tools.base import ToolResult
-                import time
-                results.append(ToolResult(
-                    success=False,
-                    data=current_data,
-                    metadata={},
-                    errors=errors,
-                    tool_name=tool.name,
-                ))
+                failed = ToolResult(success=False, data=None, metadata={}, errors=errors, tool_name=tool.name)
+                tools = tools[:k]
                 break
+            start = time.time()
+            batch = tool.run_arrow(batch, config)
+            elapsed[k] += time.time() - start
+        if not tools:
+            failed.data = data
+            return data, [], failed
 
-            cb = None
+        out = [batch]
+        n_batches = len(batches)
+        names = ", ".join(t.name for t in tools)
+        for b, batch in enumerate(batches[1:], start=2):
+            for k, tool in enumerate(tools):
+                start = time.time()
+                batch = tool.run_arrow(batch, config)
+                elapsed[k] += time.time() - start
+            out.append(batch)
             if progress_callback:
-                def cb(p, msg, tool_idx=i, total=len(self.tools)):
-                    progress_callback((tool_idx + p) / total, f"[{tool.name}] {msg}")
+                progress_callback((done + len(tools) * b / n_batches) / len(self.plan),
+                                  f"[{names}] batch {b}/{n_batches}")
+        del batches
+
+        table = pa.Table.from_batches(out)
+        del out
+        frame = self._to_pandas(table)
+        del table
+        # Batches rebuilt by a tool lose the pandas metadata that restores the index
+        if all(c in frame.columns for c in index_cols):
+            frame = frame.set_index(index_cols)
+            frame.index.names = data.index.names
+
+        results = [
+            ToolResult(success=True, data=None, metadata={"batches": n_batches}, errors=[],
+                       tool_name=tool.name, elapsed_seconds=elapsed[k])
+            for k, tool in enumerate(tools)
+        ]
+        results[-1].data = frame
+        if failed is not None:
+            failed.data = frame
+        return frame, results, failed
 
-            result = tool.run(current_data, config=config, progress_callback=cb)
-            results.append(result)
+    def _apply(self, tool: BaseTool, batch, config):
+        """Run one tool on one record batch, through pandas unless it supports Arrow."""
+        if tool.supports_arrow:
+            return tool.run_arrow(batch, config)
+        result = tool.run(self._to_pandas(pa.Table.from_batches([batch])), config=config)
+        if not result.success:
+            raise RuntimeError(f"{tool.name} failed: {'; '.join(map(str, result.errors))}")
+        return pa.RecordBatch.from_pandas(result.data, preserve_index=False)
 
-            if result.success:
-                current_data = result.data
+    def _stream(self, tools: list[BaseTool], batches: Iterator, config) -> Iterator:
+        validated = False
+        for batch in batches:
+            for tool in tools:
+                if not validated:
+                    valid, errors = tool.validate_input(batch.slice(0, _PROBE_ROWS).to_pandas())
+                    if not valid:
+                        raise ValueError(f"{tool.name}: {'; '.join(errors)}")
+                batch = self._apply(tool, batch, config)
+            validated = True
+            yield batch
+
+    def _adaptive(self, tool: BaseTool, position: int, batches: Iterator, config, progress_callback) -> Iterator:
+        """Run one tool over the stream in batches sized by its own AdaptiveBatcher."""
+        batcher = self.batchers[position] = AdaptiveBatcher(max_size=max(self.batch_size, 8192))
+        validated = False
+        for batch in batcher.rebatch(batches):
+            if not validated:
+                valid, errors = tool.validate_input(batch.slice(0, _PROBE_ROWS).to_pandas())
+                if not valid:
+                    raise ValueError(f"{tool.name}: {'; '.join(errors)}")
+                validated = True
+            start = time.time()
+            out = self._apply(tool, batch, config)
+            batcher.record(batch.num_rows, time.time() - start)
+            if progress_callback:
+                progress_callback(position / len(self.plan),
+                                  f"[{tool.name}] {batcher.rows} rows, batch {batcher.size}, "
+                                  f"{batcher.throughput:,.0f} rows/s")
+            yield out
+
+    def _barrier(self, tool: BaseTool, batches: Iterator, config) -> Iterator:
+        collected = list(batches)
+        if not collected:
+            return
+        frame = self._to_pandas(pa.Table.from_batches(collected))
+        del collected
+        valid, errors = tool.validate_input(frame)
+        if not valid:
+            raise ValueError(f"{tool.name}: {'; '.join(errors)}")
+        result = tool.run(frame, config=config)
+        if not result.success:
+            raise RuntimeError(f"{tool.name} failed: {'; '.join(map(str, result.errors))}")
+        yield from pa.Table.from_pandas(result.data, preserve_index=False).to_batches(max_chunksize=self.batch_size)
+
+    def run_iter(self, batches: Iterable, config=None, progress_callback=None) -> Iterator:
+        """
+        Stream pyarrow record batches through the tools so memory stays
+        O(batch). Tools with kind="reduce" are barriers that see all batches
+        concatenated. With adaptive_batching each other tool re-cuts the
+        stream to its own batch size (self.batchers[position] holds the
+        measurements; progress_callback gets them per batch); otherwise
+        each batch passes through every tool before the next is pulled.
+        Validation runs once, on the first batch each tool receives; a
+        failure raises ValueError, a failed tool RuntimeError.
+        """
+        if pa is None:
+            raise ImportError("Pipeline.run_iter requires pyarrow")
+        self.batchers = {}
+        stream = iter(batches)
+        segment = []
+        for position, tool in enumerate(self.plan):
+            if tool.kind == "reduce":
+                if segment:
+                    stream = self._stream(segment, stream, config)
+                    segment = []
+                stream = self._barrier(tool, stream, config)
+            elif self.adaptive_batching:
+                stream = self._adaptive(tool, position, stream, config, progress_callback)
+            else:
+                segment.append(tool)
+        if segment:
+            stream = self._stream(segment, stream, config)
+        yield from stream
+
+    def run(self, data: pd.DataFrame, config=None, progress_callback=None) -> list[ToolResult]:
+        """
+        Results are in execution order (stage by stage); stops at the first
+        tool whose input fails validation. Unless keep_intermediate is set,
+        only the last result carries a frame: the pipeline's output. Frames that came back from Arrow
+        (Arrow tool runs, on-disk cache hits) may have read-only columns:
+        .copy() them before editing in place.
+        """
+        n = len(self.plan)
+        self._hashed = None
+        # One slot per planned tool; `done` counts filled slots
+        results: list = [None] * n
+        done = 0
+        # A callable dtype_policy has no stable identity to key on (every lambda shares a name)
+        use_disk = (self.cache_dir is not None and pa is not None and n > 0 and not self.keep_intermediate
+                    and not callable(self.dtype_policy))
+        config_key = repr(config) if self.cache_size > 0 or use_disk else None
+        sig = self._run_signature(data, config_key) if use_disk else None
+        if sig is not None:
+            cached = self._load_run(sig)
+            if cached is not None:
+                if progress_callback:
+                    progress_callback(1.0, "Reused cached pipeline run")
+                return cached
+        if self.dtype_policy is not None:
+            before = data.memory_usage(deep=True).sum()
+            data = _apply_dtype_policy(data, self.dtype_policy)
+            self.bytes_saved = int(before - data.memory_usage(deep=True).sum())
+        current_data = data
+        adapter = _ProgressAdapter(progress_callback, n) if progress_callback else None
+        released = 0  # results[:released] no longer hold frames
+        # Schema on which schema-only requirements were last checked, and which passed
+        validated_schema, validated_reqs = None, set()
+        # Shared by validators until the running frame changes
+        column_index = None
+
+        stages = self.stages
+        s = 0
+        while s < len(stages):
+            stage = stages[s]
+            s += 1
+            if self._arrow_stage(stage):
+                # Maximal run of consecutive single-tool Arrow stages
+                chain = [stage[0]]
+                while s < len(stages) and self._arrow_stage(stages[s]):
+                    chain.append(stages[s][0])
+                    s += 1
+                current_data, chain_results, failed = self._run_arrow_chain(
+                    chain, current_data, config, progress_callback, done)
+                results[done:done + len(chain_results)] = chain_results
+                done += len(chain_results)
+                if failed is not None:
+                    results[done] = failed
+                    done += 1
+                    break
+                if not self.keep_intermediate:
+                    released = _release_frames(results, released, done)
+                continue
+
+            runnable = []
+            failed = None
+            for i in stage:
+                tool = self.plan[i]
+                reqs = tool.input_schema_requirements()
+                schema = self._schema_fingerprint(current_data) if reqs is not None else None
+                if reqs is not None and schema == validated_schema and reqs.items() <= validated_reqs:
+                    # Same schema, and these exact requirements already passed on it
+                    valid, errors = True, []
+                else:
+                    if not self._takes_column_index[i]:
+                        valid, errors = tool.validate_input(current_data)
+                    else:
+                        if column_index is None or not column_index.describes(current_data):
+                            column_index = ColumnIndex(current_data)
+                        valid, errors = tool.validate_input(current_data, column_index=column_index)
+                    if valid and reqs is not None:
+                        if schema != validated_schema:
+                            validated_schema, validated_reqs = schema, set()
+                        validated_reqs |= reqs.items()
+                if not valid:
+                    failed = ToolResult(
+                        success=False,
+                        data=current_data,
+                        metadata={},
+                        errors=errors,
+                        tool_name=tool.name,
+                    )
+                    break
+                runnable.append(i)
+
+            if len(runnable) == 1:
+                i = runnable[0]
+                tool = self.plan[i]
+                if adapter is not None:
+                    adapter.i = done
+                    adapter.name = tool.name
+
+                result = self._cached_run(tool, self._input_for(tool, current_data, data), config, config_key, adapter,
+                                          self._frame_view(tool, current_data))
+                results[done] = result
+                done += 1
+
+                if result.success:
+                    current_data = result.data
+            elif runnable:
+                # Every tool in the stage reads the stage input; progress is
+                # reported from this thread as each tool finishes
+                stage_input = current_data
+                # With worker processes the threads only wait on them (and serve cache hits)
+                handle = self._share_stage_input(stage_input)
+                try:
+                    with ThreadPoolExecutor(max_workers=len(runnable)) as ex:
+                        futures = [
+                            ex.submit(self._cached_run, self.plan[i],
+                                      stage_input if handle else self._input_for(self.plan[i], stage_input, data),
+                                      config, config_key, None,
+                                      None if handle else self._frame_view(self.plan[i], stage_input), handle)
+                            for i in runnable
+                        ]
+                        first = done
+                        for i, fut in zip(runnable, futures):
+                            results[done] = fut.result()
+                            done += 1
+                            if progress_callback:
+                                progress_callback(done / n, f"[{self.plan[i].name}] done")
+                finally:
+                    if handle is not None:
+                        unlink_frame(handle[0])
+
+                # Written columns are merged in one assign so the frame isn't rebuilt per tool
+                updates = {}
+                for i, result in zip(runnable, results[first:done]):
+                    if not result.success:
+                        continue
+                    writes = self.plan[i].writes
+                    if writes is None:
+                        current_data = result.data
+                    elif writes:
+                        updates.update((c, result.data[c]) for c in writes)
+                if updates:
+                    current_data = _merge_columns(current_data, updates)
+
+            if failed is not None:
+                results[done] = failed
+                done += 1
+                break
+            if not self.keep_intermediate:
+                released = _release_frames(results, released, done)
 
+        if not self.keep_intermediate and done:
+            _release_frames(results, released, done - 1)
+            results[done - 1] = replace(results[done - 1], data=current_data)
+        if done < n:
+            return results[:done]
+        if sig is not None and all(r.success for r in results):
+            self._save_run(sig, results, current_data)
         return results
@@ -0,0 +1,115 @@
+"""Frames across process boundaries as Arrow IPC in shared memory."""
+import os
+from multiprocessing import resource_tracker, shared_memory
+import pandas as pd
+from src.tools.base import BaseTool, ToolResult
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: Pipeline runs stages on threads only
+    pa = None
+
+_SHM_DIR = "/dev/shm"
+# Leading rows converted back to check that a frame survives the Arrow round-trip
+_CHECK_ROWS = 64
+
+
+def _round_trips(df: pd.DataFrame, table) -> bool:
+    """False when Arrow -> pandas would hand back other dtypes, e.g. an object column of ints as float64."""
+    back = table.slice(0, _CHECK_ROWS).to_pandas()
+    return back.index.dtype == df.index.dtype and list(back.dtypes) == list(df.dtypes)
+
+
+def _write_stream(table, sink):
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def put_frame(df: pd.DataFrame, handoff: bool = False) -> tuple[str, int]:
+    """
+    Write `df` (index included) as an Arrow IPC stream into a new
+    shared-memory block; returns (name, size) for read_frame. With
+    `handoff` the reader owns the block and must unlink it; otherwise the
+    caller does via unlink_frame. Raises pa.ArrowException for columns
+    Arrow can't represent, ValueError for ones it would return as another dtype.
+    """
+    table = pa.Table.from_pandas(df)
+    if not _round_trips(df, table):
+        raise ValueError("frame does not survive an Arrow round-trip with the same dtypes")
+    mock = pa.MockOutputStream()
+    _write_stream(table, mock)
+    size = mock.size()
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        buf = pa.py_buffer(shm.buf)
+        _write_stream(table, pa.FixedSizeBufferWriter(buf))
+        del buf  # release the export so the block can be closed
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    if handoff:
+        # Otherwise this process's tracker would unlink it at exit, or warn that it leaked
+        resource_tracker.unregister(shm._name, "shared_memory")
+    shm.close()
+    return shm.name, size
+
+
+def unlink_frame(name: str):
+    shm = shared_memory.SharedMemory(name=name)
+    shm.close()
+    shm.unlink()
+
+
+def read_frame(name: str, size: int, unlink: bool = False) -> pd.DataFrame:
+    """
+    Rebuild the frame put_frame stored. Where shared memory is a file
+    (Linux /dev/shm) it is memory-mapped, so columns stay zero-copy views
+    of the block (read-only) and outlive an unlink; elsewhere it's copied out.
+    """
+    path = os.path.join(_SHM_DIR, name.lstrip("/"))
+    if os.path.exists(path):
+        source = pa.memory_map(path)
+    else:
+        shm = shared_memory.SharedMemory(name=name)
+        source = pa.BufferReader(pa.py_buffer(bytes(shm.buf[:size])))
+        shm.close()
+    table = pa.ipc.open_stream(source).read_all()
+    if unlink:
+        unlink_frame(name)
+    return table.to_pandas(split_blocks=True, self_destruct=True, zero_copy_only=False)
+
+
+def pack_result(result: ToolResult, columns=None) -> tuple:
+    """
+    Worker side: (frame handle, fields). The frame goes to shared memory
+    (only `columns` of it when given) unless Arrow can't hold it as is; it
+    and the other fields are pickled otherwise.
+    """
+    frame = result.data
+    if frame is not None and columns is not None:
+        frame = frame[[c for c in frame.columns if c in columns]]
+    if frame is not None:
+        try:
+            frame = put_frame(frame, handoff=True)
+        except (pa.ArrowException, ValueError):
+            pass
+    return frame, (result.success, result.metadata, result.errors, result.tool_name, result.elapsed_seconds)
+
+
+def unpack_result(packed: tuple) -> ToolResult:
+    frame, fields = packed
+    if isinstance(frame, tuple):
+        frame = read_frame(*frame, unlink=True)
+    success, metadata, errors, tool_name, elapsed = fields
+    return ToolResult(success=success, data=frame, metadata=metadata, errors=errors,
+                      tool_name=tool_name, elapsed_seconds=elapsed)
+
+
+def run_remote(tool: BaseTool, handle: tuple, config, columns=None, deep_copy: bool = False) -> tuple:
+    """Process-pool entry point: run `tool` on the shared-memory frame `handle`, return pack_result()."""
+    data = read_frame(*handle)
+    if tool.mutates_input:
+        # Mapped columns are read-only; under Copy-on-Write a shallow copy is enough
+        data = data.copy(deep=deep_copy)
+    return pack_result(tool.run(data, config=config), columns)
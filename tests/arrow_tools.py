@@ -0,0 +1,50 @@
+"""Minimal supports_arrow tools for the pipeline tests: each has a pandas run() and an equivalent run_arrow()."""
+import pyarrow.compute as pc
+
+from src.tools.base import BaseTool, ToolResult
+
+
+class _ArrowTool(BaseTool):
+    description = "Test tool"
+    supports_arrow = True
+    kind = "map"
+
+    def validate_input(self, data, column_index=None):
+        missing = [c for c in sorted(self.reads) if c not in data.columns]
+        return not missing, [f"Missing column: {c}" for c in missing]
+
+
+class ArrowFilter(_ArrowTool):
+    """Keeps rows whose `column` is above `threshold`."""
+    name = "ArrowFilter"
+    kind = "shape"
+
+    def __init__(self, column: str, threshold: float):
+        self.column = column
+        self.threshold = threshold
+        self.reads = frozenset({column})
+        self.writes = None
+
+    def run(self, data, config=None, progress_callback=None):
+        return ToolResult(True, data[data[self.column] > self.threshold], {}, [], self.name)
+
+    def run_arrow(self, batch, config=None):
+        return batch.filter(pc.greater(batch[self.column], self.threshold))
+
+
+class ArrowScale(_ArrowTool):
+    """Adds `target = source * factor`."""
+    name = "ArrowScale"
+
+    def __init__(self, source: str, target: str, factor: float):
+        self.source = source
+        self.target = target
+        self.factor = factor
+        self.reads = frozenset({source})
+        self.writes = frozenset({target})
+
+    def run(self, data, config=None, progress_callback=None):
+        return ToolResult(True, data.assign(**{self.target: data[self.source] * self.factor}), {}, [], self.name)
+
+    def run_arrow(self, batch, config=None):
+        return batch.append_column(self.target, pc.multiply(batch[self.source], self.factor))
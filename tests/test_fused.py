@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tools import fused
+from src.tools.fused import ExprTool, FusedMapTool
+
+
+def _chain():
+    return FusedMapTool([ExprTool("y = maximum(x, 0.5)"), ExprTool("z = y * 2 + sqrt(abs(x))")])
+
+
+@pytest.mark.skipif(fused.numba is None, reason="numba not installed")
+def test_numba_matches_numpy_including_nan(monkeypatch):
+    n = 200_000
+    x = np.random.default_rng(0).random(n)
+    x[::7] = np.nan
+    x[3::11] = np.inf
+    df = pd.DataFrame({"x": x})
+
+    compiled = _chain().run(df)
+    monkeypatch.setattr(fused, "numba", None)
+    reference = _chain().run(df)
+
+    assert compiled.metadata["engine"] == "numba"
+    assert reference.metadata["engine"] == "numpy"
+    assert compiled.data["z"].isna().sum() == reference.data["z"].isna().sum() > 0
+    pd.testing.assert_frame_equal(compiled.data, reference.data)
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from arrow_tools import ArrowFilter, ArrowScale
+from src.tools.fused import ExprTool
+from src.tools.pipeline import Pipeline
+
+
+def test_memo_sees_change_outside_any_sample():
+    df = pd.DataFrame({"a": np.arange(1000, dtype=float)})
+    pipeline = Pipeline([ExprTool("b = a * 2")], cache_size=8)
+    assert pipeline.run(df)[-1].data["b"][5] == 10.0
+
+    df.loc[5, "a"] = 999.0
+    assert pipeline.run(df)[-1].data["b"][5] == 1998.0
+
+
+def test_memo_reuses_result_for_equal_input():
+    df = pd.DataFrame({"a": np.arange(1000, dtype=float)})
+    pipeline = Pipeline([ExprTool("b = a * 2")], cache_size=8)
+    pipeline.run(df)
+    assert pipeline.run(df.copy())[-1].data["b"].tolist() == (df["a"] * 2).tolist()
+    assert len(pipeline._cache) == 1
+
+
+def _pandas_chain(tools, df):
+    for tool in tools:
+        df = tool.run(df).data
+    return df
+
+
+def test_arrow_chain_matches_pandas_run_and_keeps_index():
+    df = pd.DataFrame({"a": [3.0, 0.5, 2.0, 4.0], "s": list("pqrs")}, index=pd.Index(["w", "x", "y", "z"], name="key"))
+    tools = [ArrowFilter("a", 1.0), ArrowScale("a", "b", 2.0)]
+
+    results = Pipeline(tools, batch_size=2).run(df)
+
+    assert [r.success for r in results] == [True, True]
+    assert results[0].metadata["batches"] == 2
+    out = results[-1].data
+    pd.testing.assert_frame_equal(out, _pandas_chain(tools, df))
+    assert out.index.tolist() == ["w", "y", "z"]
+
+
+def test_arrow_chain_keeps_range_index_labels_after_filter():
+    df = pd.DataFrame({"a": [3.0, 0.5, 2.0, 4.0]})
+    out = Pipeline([ArrowFilter("a", 1.0)], batch_size=3).run(df)[-1].data
+    assert out.index.tolist() == [0, 2, 3]
+
+
+def test_arrow_chain_validation_failure_on_first_batch():
+    df = pd.DataFrame({"a": [3.0, 0.5, 2.0]})
+    results = Pipeline([ArrowScale("a", "b", 2.0), ArrowScale("missing", "c", 1.0)]).run(df)
+
+    assert [r.success for r in results] == [True, False]
+    assert results[-1].errors == ["Missing column: missing"]
+    assert results[-1].data["b"].tolist() == [6.0, 1.0, 4.0]
+
+
+def test_callable_dtype_policies_do_not_share_disk_cache_entries(tmp_path):
+    df = pd.DataFrame({"a": [1.0, 2.0, 3.0]})
+    tools = [ExprTool("b = a + 1")]
+
+    first = Pipeline(tools, cache_dir=str(tmp_path), dtype_policy=lambda f: {"a": "float64"}).run(df)
+    second = Pipeline(tools, cache_dir=str(tmp_path), dtype_policy=lambda f: {"a": "int64"}).run(df)
+
+    assert first[-1].data["a"].dtype == "float64"
+    assert second[-1].data["a"].dtype == "int64"
+    assert not list(tmp_path.iterdir())
+
+
+def test_dict_dtype_policy_is_part_of_disk_cache_key(tmp_path):
+    df = pd.DataFrame({"a": [1.0, 2.0, 3.0]})
+    tools = [ExprTool("b = a + 1")]
+
+    Pipeline(tools, cache_dir=str(tmp_path), dtype_policy={"a": "float64"}).run(df)
+    second = Pipeline(tools, cache_dir=str(tmp_path), dtype_policy={"a": "int64"}).run(df)
+    again = Pipeline(tools, cache_dir=str(tmp_path), dtype_policy={"a": "int64"}).run(df)
+
+    assert second[-1].data["a"].dtype == "int64"
+    assert again[-1].data["a"].dtype == "int64"
+    assert len(list(tmp_path.glob("*.parquet"))) == 2
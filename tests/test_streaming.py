@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from arrow_tools import ArrowFilter, ArrowScale
+from src.tools.base import BaseTool, ToolResult
+from src.tools.batching import AdaptiveBatcher
+from src.tools.fused import ExprTool
+from src.tools.pipeline import Pipeline
+
+
+class RankTool(BaseTool):
+    """Needs every row at once: rank of `a` over the whole frame."""
+    name = "RankTool"
+    description = "Test tool"
+    kind = "reduce"
+    reads = frozenset({"a"})
+    writes = frozenset({"rank"})
+
+    def validate_input(self, data, column_index=None):
+        return "a" in data.columns, [] if "a" in data.columns else ["Missing column: a"]
+
+    def run(self, data, config=None, progress_callback=None):
+        return ToolResult(True, data.assign(rank=data["a"].rank()), {}, [], self.name)
+
+
+def _frame(n=1000):
+    return pd.DataFrame({"a": np.random.default_rng(0).permutation(n).astype(float)})
+
+
+def _batches(df, size):
+    return pa.Table.from_pandas(df, preserve_index=False).to_batches(max_chunksize=size)
+
+
+def _collect(batches):
+    return pa.Table.from_batches(list(batches)).to_pandas()
+
+
+@pytest.mark.parametrize("adaptive", [False, True])
+@pytest.mark.parametrize("tools", [
+    [ExprTool("b = a * 2")],
+    [ExprTool("b = a * 2"), RankTool(), ExprTool("c = rank + b")],
+    [ArrowFilter("a", 100.0), ArrowScale("a", "b", 3.0), RankTool()],
+], ids=["map", "barrier", "arrow"])
+def test_run_iter_matches_run(tools, adaptive):
+    df = _frame()
+    expected = Pipeline(tools).run(df)[-1].data.reset_index(drop=True)
+    streamed = _collect(Pipeline(tools, adaptive_batching=adaptive).run_iter(_batches(df, 64)))
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
+
+
+def test_run_iter_validation_failure_mid_stream():
+    tools = [ExprTool("b = a * 2"), RankTool(), ExprTool("c = missing + 1")]
+    with pytest.raises(ValueError, match="Missing column: missing"):
+        list(Pipeline(tools).run_iter(_batches(_frame(), 64)))
+
+
+def test_run_iter_failed_tool_raises():
+    class Failing(RankTool):
+        kind = "map"
+
+        def run(self, data, config=None, progress_callback=None):
+            return ToolResult(False, None, {}, ["boom"], self.name)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        list(Pipeline([Failing()]).run_iter(_batches(_frame(), 64)))
+
+
+def test_adaptive_batching_recuts_stream():
+    df = _frame(5000)
+    pipeline = Pipeline([ExprTool("b = a * 2")], adaptive_batching=True)
+    sizes = [b.num_rows for b in pipeline.run_iter(_batches(df, 10))]
+
+    assert sum(sizes) == len(df)
+    assert sizes[0] == 16  # AdaptiveBatcher starts at its minimum
+    assert max(sizes) > 10
+    batcher = pipeline.batchers[0]
+    assert batcher.rows == len(df) and batcher.batches == len(sizes)
+
+
+def test_fixed_batching_keeps_caller_batches():
+    sizes = [b.num_rows for b in Pipeline([ExprTool("b = a * 2")], adaptive_batching=False)
+             .run_iter(_batches(_frame(100), 10))]
+    assert sizes == [10] * 10
+
+
+def test_adaptive_batcher_grows_while_cost_falls_and_halves_on_spike():
+    batcher = AdaptiveBatcher(min_size=16, max_size=128)
+    batcher.record(16, 0.016)
+    assert batcher.size == 32
+    batcher.record(32, 0.016)  # cheaper per row: keep growing
+    assert batcher.size == 64
+    batcher.record(64, 0.032)
+    assert batcher.size == 128
+    batcher.record(128, 0.064)  # capped at max_size
+    assert batcher.size == 128
+    batcher.record(128, 1.0)  # per-row cost spikes far above the EMA
+    assert batcher.size == 64
+
+
+def test_rebatch_yields_empty_batch_for_empty_stream():
+    empty = pa.RecordBatch.from_pandas(_frame(0), preserve_index=False)
+    out = list(AdaptiveBatcher().rebatch(iter([empty])))
+    assert [b.num_rows for b in out] == [0]
@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tools import transport
+from src.tools.base import BaseTool, ToolResult
+from src.tools.fused import ExprTool
+from src.tools.pipeline import Pipeline
+from src.tools.transport import put_frame, read_frame
+
+
+def _blocks():
+    return set(os.listdir(transport._SHM_DIR)) if os.path.isdir(transport._SHM_DIR) else set()
+
+
+class PidTool(BaseTool):
+    """Records which process ran it and the dtype it saw."""
+    description = "Test tool"
+    kind = "map"
+    reads = frozenset({"a"})
+
+    def __init__(self, target: str):
+        self.name = f"PidTool[{target}]"
+        self.target = target
+        self.writes = frozenset({target})
+
+    def validate_input(self, data, column_index=None):
+        return True, []
+
+    def run(self, data, config=None, progress_callback=None):
+        return ToolResult(True, data.assign(**{self.target: str(data["a"].dtype)}), {"pid": os.getpid()}, [], self.name)
+
+
+class RaisingTool(PidTool):
+    def run(self, data, config=None, progress_callback=None):
+        raise RuntimeError("tool crashed")
+
+
+def test_put_read_round_trip_keeps_values_dtypes_and_index():
+    df = pd.DataFrame(
+        {"x": np.arange(5, dtype=np.int32), "y": [0.5, np.nan, 1.5, 2.0, 3.0], "s": list("abcde")},
+        index=pd.Index([10, 20, 30, 40, 50], name="row"),
+    )
+    before = _blocks()
+    name, size = put_frame(df)
+    out = read_frame(name, size, unlink=True)
+
+    pd.testing.assert_frame_equal(out, df)
+    assert _blocks() == before
+
+
+def test_put_frame_rejects_frames_whose_dtypes_would_change():
+    df = pd.DataFrame({"o": pd.Series([1, None, 3], dtype=object)})
+    before = _blocks()
+    with pytest.raises(ValueError):
+        put_frame(df)
+    assert _blocks() == before
+
+
+def test_processes_match_threads():
+    df = pd.DataFrame({"a": np.arange(1000, dtype=float)}, index=np.arange(1000) * 3)
+    tools = [ExprTool("b = a * 2"), ExprTool("c = a + 1"), PidTool("d")]
+    threaded = Pipeline(tools).run(df)[-1].data
+    pipeline = Pipeline(tools, processes=2)
+    try:
+        results = pipeline.run(df)
+    finally:
+        pipeline.close()
+
+    pd.testing.assert_frame_equal(results[-1].data, threaded)
+    assert results[-1].metadata["pid"] != os.getpid()
+
+
+def test_processes_fall_back_to_threads_when_round_trip_changes_dtypes():
+    df = pd.DataFrame({"a": pd.Series([1, None, 3], dtype=object)})
+    pipeline = Pipeline([PidTool("b"), PidTool("c")], processes=2)
+    try:
+        results = pipeline.run(df)
+    finally:
+        pipeline.close()
+
+    assert [r.metadata["pid"] for r in results] == [os.getpid()] * 2
+    assert results[-1].data["b"].tolist() == ["object"] * 3
+    assert pipeline._pool is None  # no workers were started
+
+
+@pytest.mark.skipif(not os.path.isdir(transport._SHM_DIR), reason="shared memory is not file-backed here")
+def test_stage_input_block_is_unlinked_when_a_tool_raises():
+    df = pd.DataFrame({"a": np.arange(100, dtype=float)})
+    before = _blocks()
+    pipeline = Pipeline([PidTool("b"), RaisingTool("c")], processes=2)
+    try:
+        with pytest.raises(RuntimeError, match="tool crashed"):
+            pipeline.run(df)
+    finally:
+        pipeline.close()
+    assert _blocks() == before